@@ -18,4 +18,26 @@ LOGGER = setup_logger(
     log_dir=Path(os.environ.get("LOG_DIR","logs")),
     log_prefix="SEVEN_SIX_ETL",
     level=20,  # INFO
-)
\ No newline at end of file
+)
+
+# Bump when a change to the conversion logic should force every file to be reprocessed.
+PIPELINE_VERSION = "1"
+# Manifest of processed files used for incremental runs.
+MANIFEST_PATH = Path(os.environ.get("MANIFEST_PATH", OUTPUT_PATH / "etl_manifest.db"))
+# Number of docling worker processes (1 = convert in the main process).
+NUM_WORKERS = int(os.environ.get("NUM_WORKERS", "1"))
+# Cache of converted DoclingDocuments; set DOC_CACHE_DIR="" to disable.
+DOC_CACHE_DIR = os.environ.get("DOC_CACHE_DIR", str(OUTPUT_PATH / "docling_cache")) or None
+# Convert born-digital text PDFs from their text layer instead of the layout/table models.
+PDF_ROUTING = os.environ.get("PDF_ROUTING", "1") not in ("0", "false", "False", "")
+# Page-range sharding of large PDFs across the conversion workers (NUM_WORKERS > 1);
+# SHARD_PAGES=0 disables it.
+SHARD_PAGES = int(os.environ.get("SHARD_PAGES", "50"))
+SHARD_MIN_PAGES = int(os.environ.get("SHARD_MIN_PAGES", "100"))
+# Token budget and overlap of the chunks stored in Weaviate.
+CHUNK_MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", "512"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "64"))
+# Parquet staging cache of parsed CSV files and workbook sheets; set STAGING_DIR="" to disable.
+STAGING_DIR = os.environ.get("STAGING_DIR", str(OUTPUT_PATH / "parquet_staging")) or None
+# Cache of Agentic Doc extraction results (document hash + schema hash); set EXTRACTION_CACHE_PATH="" to disable.
+EXTRACTION_CACHE_PATH = os.environ.get("EXTRACTION_CACHE_PATH", str(OUTPUT_PATH / "extraction_cache.db")) or None
@@ -1,7 +1,16 @@
 # extractor.py
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from agentic_doc.parse import parse
-from typing import Optional, Type
+from typing import AsyncIterator, Callable, Optional, Sequence, Tuple, Type, Union
+from pathlib import Path
 from pydantic import BaseModel, Field
+from src.extraction_cache import ExtractionCache, schema_hash
+from src.hash_utils import hash_file
+from src.logger import setup_logger
+from src.page_selection import select_pages, write_pages
+from src.rate_limiter import AdaptiveTokenBucket, throttle_info
 
 
 class PersonExtractedFields(BaseModel):
@@ -29,6 +38,22 @@ class OrganizationExtractedFields(BaseModel):
     )
 
 
+class ExtractionFailed(Exception):
+    """The service returned a document without an extraction; ``status_code`` is set when it was throttled."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _parse_errors(parsed) -> str:
+    """Page and extraction errors agentic_doc reported on a ParsedDocument instead of raising."""
+    messages = [f"page {e.page_num}: {e.error}" for e in getattr(parsed, "errors", None) or []]
+    if getattr(parsed, "extraction_error", None):
+        messages.append(parsed.extraction_error)
+    return "; ".join(messages)
+
+
 class AgenticExtractor:
     """
     Class to handle the extraction of data from documents using Agentic Doc.
@@ -37,32 +62,168 @@ class AgenticExtractor:
     def __init__(self,
                  include_marginalia: bool = False,
                  include_metadata_in_markdown: bool = False,
-                 result_save_dir: Optional[str] = None):
+                 result_save_dir: Optional[str] = None,
+                 parse_fn: Optional[Callable] = None,
+                 cache_path: Optional[str] = None,
+                 preselect_pages: bool = True):
         """
         Initialize the AgenticExtractor.
+
+        :param parse_fn: Replacement for ``agentic_doc.parse.parse`` with the same
+                         signature, e.g. a client of a local stand-in server for tests.
+        :param cache_path: SQLite file caching extraction results by document and schema
+                           hash; None disables the cache.
+        :param preselect_pages: Send only the PDF pages likely to hold the extraction
+                                fields (see src.page_selection), falling back to the
+                                whole document when the selection is not confident.
         """
+        self.logger = setup_logger("etl_app")
         self.include_marginalia = include_marginalia
         self.include_metadata_in_markdown = include_metadata_in_markdown
         self.result_save_dir = result_save_dir
+        self.parse_fn = parse_fn or parse
+        self.cache = ExtractionCache(cache_path) if cache_path else None
+        self.preselect_pages = preselect_pages
 
     def parse_documents(self,
                         file_path: str,
-                        extraction_model: Type[BaseModel] = OrganizationExtractedFields) -> dict:
+                        extraction_model: Union[Type[BaseModel], dict] = OrganizationExtractedFields) -> dict:
         """
         Parse a document file using Agentic Doc and extract structured data.
 
         :param file_path: Path to the document file.
-        :param extraction_model: Pydantic model to guide the data extraction.
+        :param extraction_model: Pydantic model to guide the data extraction, or a JSON
+                                 schema dict (e.g. config/organization_schema.json).
         :return: Parsed structured data as a dictionary.
         """
-        return parse(
+        if isinstance(extraction_model, dict):
+            schema_kwargs = {"extraction_schema": extraction_model}
+        else:
+            schema_kwargs = {"extraction_model": extraction_model}
+        return self.parse_fn(
             file_path,
             include_marginalia=self.include_marginalia,
             include_metadata_in_markdown=self.include_metadata_in_markdown,
             result_save_dir=self.result_save_dir,
-            extraction_model=extraction_model
+            **schema_kwargs
         )
 
+    def cached_extraction(self, file_path: str,
+                          extraction_model: Union[Type[BaseModel], dict] = OrganizationExtractedFields):
+        """
+        Extraction of this document content with this schema from an earlier run, or None.
+        """
+        if self.cache is None:
+            return None
+        data = self.cache.get(hash_file(file_path), schema_hash(extraction_model))
+        if data is None or isinstance(extraction_model, dict):
+            return data
+        return extraction_model.model_validate(data)
+
+    def _parse_selected_pages(self, file_path: str, extraction_model: Union[Type[BaseModel], dict]):
+        pages = None
+        if self.preselect_pages and Path(file_path).suffix.lower() == ".pdf":
+            try:
+                pages = select_pages(file_path)
+            except Exception as e:
+                self.logger.warning(f"Page selection failed for {file_path}, sending all pages: {e}")
+        if pages is None:
+            return self.parse_documents(file_path, extraction_model)
+        self.logger.info(f"Sending pages {[p + 1 for p in pages]} of {file_path}")
+        with tempfile.TemporaryDirectory(prefix="agentic_pages_") as tmp_dir:
+            # Keep the file name, the service reports it back.
+            subset_path = write_pages(file_path, pages, Path(tmp_dir) / Path(file_path).name)
+            return self.parse_documents(str(subset_path), extraction_model)
+
+    def _extract_remote(self, file_path: str, extraction_model: Union[Type[BaseModel], dict]):
+        parsed = self._parse_selected_pages(file_path, extraction_model)[0]
+        extraction = parsed.extraction
+        errors = _parse_errors(parsed)
+        if extraction is None:
+            # agentic_doc does not raise, not even once its own retries on 429/503 are exhausted.
+            message = errors or "no extraction returned"
+            throttled, _ = throttle_info(RuntimeError(message))
+            raise ExtractionFailed(message, status_code=429 if throttled else None)
+        if errors:
+            self.logger.warning(f"Extracted {file_path} with errors: {errors}")
+        if self.cache is not None:
+            data = extraction.model_dump(mode="json") if isinstance(extraction, BaseModel) else extraction
+            title = extraction_model.get("title") if isinstance(extraction_model, dict) else extraction_model.__name__
+            self.cache.put(hash_file(file_path), schema_hash(extraction_model), data, schema_title=title)
+        return extraction
+
+    def extract(self, file_path: str, extraction_model: Union[Type[BaseModel], dict] = OrganizationExtractedFields):
+        """
+        Structured extraction of one document, served from the cache when the same
+        content was already extracted with the same schema.
+
+        :return: An instance of ``extraction_model`` (a dict for a JSON schema).
+        :raises ExtractionFailed: The service returned no extraction.
+        """
+        cached = self.cached_extraction(file_path, extraction_model)
+        if cached is not None:
+            return cached
+        return self._extract_remote(file_path, extraction_model)
+
+    async def extract_many(self,
+                           file_paths: Sequence[str],
+                           extraction_model: Union[Type[BaseModel], dict] = OrganizationExtractedFields,
+                           max_concurrency: int = 8,
+                           rate_limiter: Optional[AdaptiveTokenBucket] = None,
+                           max_retries: int = 5) -> AsyncIterator[Tuple[str, Optional[BaseModel], Optional[str]]]:
+        """
+        Extract many documents concurrently, yielding each result as it completes.
+
+        Up to ``max_concurrency`` parse calls run at once in worker threads, each
+        starting only when the adaptive token bucket allows it. A throttling
+        response (429/503) slows the bucket down and the document is retried, up
+        to ``max_retries`` times. Cached extractions are returned without taking a
+        token or calling the service.
+
+        :param file_paths: Documents to extract.
+        :param extraction_model: Pydantic model (or JSON schema dict) to guide the data extraction.
+        :param max_concurrency: Maximum number of extractions in flight.
+        :param rate_limiter: Token bucket shared with other callers; a default one is created otherwise.
+        :param max_retries: Retries of a throttled document.
+        :return: Async iterator of (file_path, extraction, error); error is None on success.
+        """
+        limiter = rate_limiter or AdaptiveTokenBucket()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def extract(executor, file_path):
+            async with semaphore:
+                try:
+                    cached = await loop.run_in_executor(executor, self.cached_extraction, file_path, extraction_model)
+                except Exception as e:
+                    return file_path, None, str(e)
+                if cached is not None:
+                    return file_path, cached, None
+                for attempt in range(max_retries + 1):
+                    await limiter.acquire()
+                    try:
+                        extraction = await loop.run_in_executor(executor, self._extract_remote, file_path, extraction_model)
+                    except Exception as e:
+                        throttled, retry_after = throttle_info(e)
+                        if throttled and attempt < max_retries:
+                            limiter.on_throttle(retry_after)
+                            self.logger.warning(f"Throttled on {file_path}, retrying at {limiter.rate:.2f} req/s")
+                            continue
+                        return file_path, None, str(e)
+                    limiter.on_success()
+                    return file_path, extraction, None
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="agentic")
+        tasks = [asyncio.create_task(extract(executor, file_path)) for file_path in file_paths]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Do not block the event loop on calls still running if the caller stopped early.
+            executor.shutdown(wait=False, cancel_futures=True)
+
 # Example usage
 if __name__ == "__main__":
     extractor = AgenticExtractor()
@@ -0,0 +1,191 @@
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import weaviate
+from dotenv import load_dotenv
+from weaviate.classes.query import MetadataQuery, Rerank
+
+from src.logger import setup_logger
+from src.query_cache import TTLCache
+from src.weaviate_utils import provider_headers
+
+
+@dataclass
+class QueryResult:
+    """One search hit."""
+    uuid: str
+    properties: dict = field(default_factory=dict)
+    distance: Optional[float] = None
+    score: Optional[float] = None
+    rerank_score: Optional[float] = None
+
+
+class AsyncWeaviateQueryClient:
+    """
+    asyncio query interface over a single shared Weaviate connection.
+
+    Many near_text / hybrid queries can run concurrently on the one connection
+    (gRPC multiplexes them); a semaphore caps the number in flight. Results are
+    returned as QueryResult lists and cached with a TTL.
+
+    Usage::
+
+        async with AsyncWeaviateQueryClient("Business_data_collection") as client:
+            results = await client.batch_query(["MechanicsPOM", "光学部品"])
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "Business_data_collection",
+        embedding_provider: str = "jina",
+        return_properties: Sequence[str] = ("text", "source", "headings"),
+        max_concurrency: int = 16,
+        rerank: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: float = 600,
+    ):
+        """
+        :param collection_name: Collection to query.
+        :param embedding_provider: "jina" or "openai", selects the API key header.
+        :param return_properties: Properties returned with each hit.
+        :param max_concurrency: Maximum number of queries in flight on the connection.
+        :param rerank: Rerank results on the "text" property.
+        :param cache_size: Entries of the result cache (0 disables it).
+        :param cache_ttl: Seconds before a cached result expires.
+        """
+        load_dotenv(override=True)
+        self.logger = setup_logger("etl_app")
+        self.collection_name = collection_name
+        self.embedding_provider = embedding_provider.lower()
+        self.return_properties = list(return_properties)
+        self.max_concurrency = max_concurrency
+        self.rerank = rerank
+        self.cache = TTLCache(maxsize=cache_size, ttl_seconds=cache_ttl) if cache_size else None
+        self.client = None
+        self.collection = None
+        self._semaphore = None
+
+    async def connect(self):
+        self.client = weaviate.use_async_with_local(headers=provider_headers(self.embedding_provider))
+        await self.client.connect()
+        self.collection = self.client.collections.get(self.collection_name)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self.collection = None
+
+    def _require_connection(self):
+        if self.client is None:
+            raise RuntimeError("AsyncWeaviateQueryClient is not connected: call connect() first or use 'async with'")
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def query(self, query_text: str, limit: int = 5, mode: str = "near_text",
+                    alpha: float = 0.5, filters=None) -> List[QueryResult]:
+        """
+        Run one search.
+
+        :param query_text: Query string.
+        :param limit: Number of results.
+        :param mode: "near_text" (vector search) or "hybrid" (vector + BM25).
+        :param alpha: Hybrid weighting, 1 = pure vector, 0 = pure keyword.
+        :param filters: Optional weaviate Filter.
+        :return: Ranked QueryResult list.
+        :raises RuntimeError: If the client is not connected.
+        """
+        self._require_connection()
+        key = (self.collection_name, mode, query_text, limit, alpha, repr(filters))
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        query_args = dict(
+            limit=limit,
+            filters=filters,
+            rerank=Rerank(prop="text", query=query_text) if self.rerank else None,
+            return_metadata=MetadataQuery(distance=True, score=True),
+            return_properties=self.return_properties,
+        )
+        async with self._semaphore:
+            if mode == "near_text":
+                response = await self.collection.query.near_text(query=query_text, **query_args)
+            elif mode == "hybrid":
+                response = await self.collection.query.hybrid(query=query_text, alpha=alpha, **query_args)
+            else:
+                raise ValueError(f"Unsupported query mode: {mode}")
+
+        results = [
+            QueryResult(
+                uuid=str(obj.uuid),
+                properties=dict(obj.properties),
+                distance=obj.metadata.distance,
+                score=obj.metadata.score,
+                rerank_score=obj.metadata.rerank_score,
+            )
+            for obj in response.objects
+        ]
+        if self.cache is not None:
+            self.cache.set(key, results)
+        return results
+
+    async def batch_query(self, queries: Sequence[str], **query_kwargs) -> List[List[QueryResult]]:
+        """
+        Run several searches concurrently over the shared connection.
+
+        :param queries: Query strings.
+        :param query_kwargs: Passed to ``query`` (limit, mode, alpha, filters).
+        :return: One result list per query, in input order.
+        :raises RuntimeError: If the client is not connected.
+        """
+        self._require_connection()
+        return await asyncio.gather(*(self.query(q, **query_kwargs) for q in queries))
+
+
+async def benchmark(client: AsyncWeaviateQueryClient, queries: Sequence[str], rounds: int = 3,
+                    **query_kwargs) -> dict:
+    """
+    Measure per-query latency of concurrent batch queries.
+
+    The client's result cache is bypassed so every query hits Weaviate.
+
+    :return: Dict with the number of queries, throughput and p50/p95/p99 latency (ms).
+    :raises ValueError: If there is nothing to measure (no queries or no rounds).
+    """
+    if not queries or rounds < 1:
+        raise ValueError("benchmark needs at least one query and one round")
+    cache, client.cache = client.cache, None
+    latencies = []
+
+    async def timed(query_text):
+        start = time.perf_counter()
+        await client.query(query_text, **query_kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(timed(q) for q in queries))
+        elapsed = time.perf_counter() - start
+    finally:
+        client.cache = cache
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "queries": len(latencies),
+        "queries_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentiles[49],
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+    }
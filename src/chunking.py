@@ -0,0 +1,134 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from docling_core.transforms.chunker import HierarchicalChunker
+
+_CJK = re.compile(r"[　-ヿ㐀-䶿一-鿿豈-﫿＀-￯]")
+# Zero-width split points after sentence ends and line breaks, so pieces re-join losslessly.
+_SENTENCE_END = re.compile(r"(?<=[。．！？!?\n])|(?<=\.\s)")
+
+
+def approx_token_count(text: str) -> int:
+    """
+    Cheap token estimate: one token per CJK character, one per ~4 other characters.
+    Close enough to the Jina/OpenAI tokenizers to keep chunks under the model limit.
+    """
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@dataclass
+class Chunk:
+    """One retrieval unit: its text, the heading path it sits under and its position."""
+    text: str
+    headings: List[str] = field(default_factory=list)
+    chunk_index: int = 0
+    token_count: int = 0
+
+    @property
+    def heading_path(self) -> str:
+        return " > ".join(self.headings)
+
+    @property
+    def contextualized_text(self) -> str:
+        """Text prefixed with its heading path, which is what gets embedded."""
+        return f"{self.heading_path}\n{self.text}" if self.headings else self.text
+
+
+class StructureChunker:
+    """
+    Token-budgeted chunker built on the DoclingDocument hierarchy.
+
+    docling's HierarchicalChunker yields one unit per paragraph, list or table with
+    its heading path. Consecutive units under the same headings are packed until the
+    token budget is reached; a unit that is larger than the budget on its own (a long
+    paragraph or table) is split on sentence/line boundaries. Consecutive chunks of the
+    same section share ``overlap_tokens`` of trailing text.
+    """
+
+    def __init__(self, max_tokens: int = 512, overlap_tokens: int = 64,
+                 token_counter: Optional[Callable[[str], int]] = None):
+        """
+        :param max_tokens: Token budget of a chunk, heading path included.
+        :param overlap_tokens: Tokens of the previous chunk repeated at the start of the next one.
+        :param token_counter: Function counting tokens; defaults to approx_token_count.
+        """
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = token_counter or approx_token_count
+        self._units = HierarchicalChunker()
+
+    def _split_pieces(self, text: str, budget: int) -> List[str]:
+        """Split a text into sentence/line pieces, hard-cutting any piece over budget."""
+        pieces = []
+        for sentence in _SENTENCE_END.split(text):
+            while sentence.strip() and self.count_tokens(sentence) > budget:
+                # Cut proportionally to the token density of this sentence.
+                cut = max(1, len(sentence) * budget // self.count_tokens(sentence))
+                while cut > 1 and self.count_tokens(sentence[:cut]) > budget:
+                    cut -= max(1, cut // 20)
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:]
+            if sentence.strip():
+                pieces.append(sentence)
+        return pieces
+
+    def _overlap_tail(self, pieces: List[tuple]) -> List[tuple]:
+        """Trailing (piece, starts_unit) entries of a chunk that fit in the overlap budget."""
+        tail, tokens = [], 0
+        for piece in reversed(pieces):
+            tokens += self.count_tokens(piece[0])
+            if tokens > self.overlap_tokens:
+                break
+            tail.insert(0, piece)
+        return tail
+
+    def chunk(self, document) -> List[Chunk]:
+        """
+        Chunk a DoclingDocument.
+
+        :param document: Converted DoclingDocument.
+        :return: Chunks in reading order, with chunk_index set.
+        """
+        chunks = []
+        current, current_tokens, current_headings = [], 0, None
+
+        def flush():
+            if current:
+                # Units are separated by a line break, pieces of one unit are re-joined as they were.
+                text = "".join(("\n" if starts_unit and i else "") + piece
+                               for i, (piece, starts_unit) in enumerate(current))
+                chunks.append(Chunk(text=text.strip(), headings=list(current_headings or [])))
+
+        for unit in self._units.chunk(document):
+            headings = list(unit.meta.headings or [])
+            if headings != current_headings:
+                flush()
+                current, current_tokens, current_headings = [], 0, headings
+            heading_tokens = self.count_tokens(" > ".join(headings)) + 1 if headings else 0
+            budget = max(1, self.max_tokens - heading_tokens)
+
+            # A unit that fits is kept whole (tables and lists stay intact);
+            # otherwise it is cut into sentence-sized pieces.
+            unit_tokens = self.count_tokens(unit.text)
+            pieces = [unit.text] if unit_tokens <= budget else self._split_pieces(unit.text, budget)
+            for piece_ix, piece in enumerate(pieces):
+                piece_tokens = self.count_tokens(piece)
+                if current and current_tokens + piece_tokens > budget:
+                    flush()
+                    current = self._overlap_tail(current)
+                    current_tokens = sum(self.count_tokens(p) for p, _ in current)
+                    if current_tokens + piece_tokens > budget:
+                        current, current_tokens = [], 0
+                current.append((piece, piece_ix == 0))
+                current_tokens += piece_tokens
+        flush()
+
+        for chunk_index, chunk in enumerate(chunks):
+            chunk.chunk_index = chunk_index
+            chunk.token_count = self.count_tokens(chunk.contextualized_text)
+        return chunks
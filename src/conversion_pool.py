@@ -0,0 +1,204 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from src.logger import setup_logger
+
+# One DoclingConverter per worker process, built once by the pool initializer
+# so the layout/table models stay loaded between files.
+_worker_converter = None
+
+
+def _init_worker(num_threads: int, cache_dir, route_pdfs: bool = True):
+    global _worker_converter
+    from docling.datamodel.base_models import InputFormat
+    from src.docling_extractor import DoclingConverter
+
+    _worker_converter = DoclingConverter(num_threads=num_threads, cache_dir=cache_dir, route_pdfs=route_pdfs)
+    try:
+        _worker_converter.doc_converter.initialize_pipeline(InputFormat.PDF)
+    except Exception as e:
+        setup_logger("etl_app").warning(f"Could not pre-load the PDF pipeline in worker {os.getpid()}: {e}")
+
+
+def _convert_in_worker(input_paths):
+    """
+    Convert a list of files in a worker process.
+
+    Only picklable values go back to the parent: the DoclingDocument and an error string.
+    """
+    results = []
+    try:
+        for source, document, error in _worker_converter.iter_documents(input_paths):
+            results.append((source, document, error))
+    except Exception as e:
+        done = {source for source, _, _ in results}
+        results.extend((path, None, str(e)) for path in input_paths if path not in done)
+    return results
+
+
+def _convert_range_in_worker(path, page_range):
+    """Convert one page range of a PDF in a worker process."""
+    try:
+        return _worker_converter.convert_page_range(path, page_range)
+    except Exception as e:
+        return None, str(e)
+
+
+class ConversionPool:
+    """
+    Process pool that converts documents with docling in parallel.
+
+    Each worker holds its own warm DocumentConverter. Converted DoclingDocuments are
+    sent back to the parent, which keeps ownership of the Weaviate/SQL sinks.
+
+    With a ``converter`` and ``shard_pages``, large PDFs are split into page-range
+    shards converted by several workers at once; the parent merges the fragments
+    back in page order (DoclingConverter.merge_shards) before yielding the document.
+    """
+
+    def __init__(self, num_workers: int = None, threads_per_worker: int = None, cache_dir=None,
+                 route_pdfs: bool = True, converter=None, shard_pages: int = 0, shard_min_pages: int = 100):
+        """
+        Initialize the ConversionPool.
+
+        :param num_workers: Number of worker processes (defaults to the CPU count).
+        :param threads_per_worker: Model threads per worker (defaults to an even share of the CPUs).
+        :param cache_dir: Converted-document cache shared by the workers; None disables it.
+        :param route_pdfs: Convert born-digital text PDFs from their text layer (see DoclingConverter.route).
+        :param converter: DoclingConverter of the parent, used to plan and merge shards.
+        :param shard_pages: Pages per shard; 0 disables sharding.
+        :param shard_min_pages: PDFs with fewer pages are converted in one pass.
+        """
+        self.logger = setup_logger("etl_app")
+        cpu_count = os.cpu_count() or 1
+        self.num_workers = num_workers or cpu_count
+        self.threads_per_worker = threads_per_worker or max(1, cpu_count // self.num_workers)
+        self.converter = converter
+        self.shard_pages = shard_pages if converter is not None else 0
+        self.shard_min_pages = shard_min_pages
+        # "spawn" keeps torch/ONNX thread pools of the parent out of the workers.
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, cache_dir, route_pdfs),
+        )
+        self.logger.info(
+            f"Started conversion pool with {self.num_workers} workers "
+            f"({self.threads_per_worker} threads each)"
+        )
+
+    def _plan(self, paths):
+        """
+        Split one task into the paths converted in a single pass and the page
+        ranges of its large PDFs.
+
+        :return: (paths, {path: page ranges})
+        """
+        whole, shards = [], {}
+        for path in paths:
+            try:
+                ranges = self.converter.shard_ranges(path, self.shard_pages, self.shard_min_pages)
+            except Exception as e:
+                self.logger.warning(f"Could not plan shards of {Path(path).name}, converting it in one pass: {e}")
+                ranges = None
+            if ranges:
+                self.logger.info(f"Sharding {Path(path).name} into {len(ranges)} page ranges")
+                shards[path] = ranges
+            else:
+                whole.append(path)
+        return whole, shards
+
+    def convert(self, tasks):
+        """
+        Convert files in the worker processes.
+
+        Shards are planned in a background thread while the workers convert, so
+        opening and profiling large PDFs never holds back the first batches. A
+        failed shard is retried once; if it fails again the document is converted
+        in one pass instead.
+
+        :param tasks: Iterable of file path lists; each list is converted by one worker call,
+                      except large PDFs, which are sharded.
+        :return: Generator of (source_path, DoclingDocument or None, error message or None)
+                 in completion order.
+        """
+        planner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shard-planner") if self.shard_pages else None
+        futures = {}
+        for paths in tasks:
+            if planner is not None:
+                futures[planner.submit(self._plan, paths)] = ("plan", paths)
+            else:
+                futures[self.executor.submit(_convert_in_worker, paths)] = ("batch", paths)
+
+        shards, fragments, pending = {}, {}, {}
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, *task = futures.pop(future)
+                    if kind == "plan":
+                        whole, planned = future.result()
+                        # Shards go first so the largest documents do not start last and dominate the tail.
+                        for path, ranges in planned.items():
+                            shards[path] = ranges
+                            fragments[path] = [None] * len(ranges)
+                            pending[path] = len(ranges)
+                            for index, page_range in enumerate(ranges):
+                                futures[self.executor.submit(_convert_range_in_worker, path, page_range)] = ("shard", path, index, 0)
+                        if whole:
+                            futures[self.executor.submit(_convert_in_worker, whole)] = ("batch", whole)
+                        continue
+
+                    if kind == "batch":
+                        try:
+                            yield from future.result()
+                        except Exception as e:
+                            # The worker died (e.g. killed by the OOM killer); fail only its files.
+                            for path in task[0]:
+                                yield path, None, str(e)
+                        continue
+
+                    path, index, attempt = task
+                    if path not in pending:
+                        # Another shard of the document failed; it is being converted in one pass.
+                        continue
+                    try:
+                        document, error = future.result()
+                    except Exception as e:
+                        document, error = None, str(e)
+                    if error:
+                        first, last = shards[path][index]
+                        if attempt == 0:
+                            self.logger.warning(f"Retrying pages {first}-{last} of {Path(path).name}: {error}")
+                            futures[self.executor.submit(_convert_range_in_worker, path, (first, last))] = ("shard", path, index, 1)
+                        else:
+                            self.logger.warning(
+                                f"Pages {first}-{last} of {Path(path).name} failed twice ({error}), converting it in one pass"
+                            )
+                            del pending[path], fragments[path]
+                            futures[self.executor.submit(_convert_in_worker, [path])] = ("batch", [path])
+                        continue
+                    fragments[path][index] = document
+                    pending[path] -= 1
+                    if pending[path]:
+                        continue
+                    del pending[path]
+                    try:
+                        yield path, self.converter.merge_shards(path, fragments.pop(path)), None
+                    except Exception as e:
+                        yield path, None, f"merging shards failed: {e}"
+        finally:
+            if planner is not None:
+                planner.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
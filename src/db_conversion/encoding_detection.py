@@ -0,0 +1,93 @@
+import codecs
+import os
+
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# utf-8 is strict enough that a sample decoding as utf-8 is utf-8. The legacy
+# Japanese encodings are not: cp932 (Microsoft's shift_jis superset, what Japanese
+# Excel and 名刺 exports write) maps almost any byte sequence to something, EUC-JP
+# text included. Both are tried and the one producing the most plausible text wins
+# (see _plausibility); cp932 wins ties, being by far the more common.
+CANDIDATE_ENCODINGS = ("utf-8", "cp932", "euc_jp")
+DEFAULT_SAMPLE_BYTES = 256 * 1024
+
+
+def _decodes(sample: bytes, encoding: str, complete: bool) -> bool:
+    # An incremental decoder tolerates a multibyte character cut at the end of the sample.
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _plausibility(text: str) -> float:
+    """
+    Share of characters usual in Japanese business text: ASCII, kana, kanji,
+    CJK punctuation and full-width forms. EUC-JP read as cp932 turns into
+    half-width katakana and rare kanji, which score low.
+    """
+    if not text:
+        return 1.0
+    usual = sum(
+        1 for c in text
+        if c < "\x7f"
+        or "\u3000" <= c <= "\u30ff"  # CJK punctuation, hiragana, katakana
+        or "\u4e00" <= c <= "\u9fff"  # common kanji
+        or "\uff01" <= c <= "\uff5e"  # full-width ASCII forms
+    )
+    return usual / len(text)
+
+
+def detect_encoding_from_sample(sample: bytes, complete: bool = False) -> str:
+    """
+    Encoding of a text sample: a BOM if present, utf-8 if the sample decodes as
+    utf-8, otherwise the legacy Japanese candidate whose decoding is the most
+    plausible, and utf-8 as the fallback.
+
+    :param sample: First bytes of the file.
+    :param complete: True when the sample is the whole file.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if _decodes(sample, CANDIDATE_ENCODINGS[0], complete):
+        return CANDIDATE_ENCODINGS[0]
+    best, best_score = None, -1.0
+    for encoding in CANDIDATE_ENCODINGS[1:]:
+        try:
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+        except UnicodeDecodeError:
+            continue
+        score = _plausibility(text)
+        if score > best_score:
+            best, best_score = encoding, score
+    return best or "utf-8"
+
+
+# (path, size, mtime) -> detected encoding. Keyed by the file's stat, not its
+# content hash, so a cache lookup never reads more than the sample.
+_detected = {}
+
+
+def detect_encoding(file_path, sample_bytes: int = DEFAULT_SAMPLE_BYTES) -> str:
+    """
+    Detect a text file's encoding from its first ``sample_bytes`` bytes, read once.
+    The decision is cached per (path, size, mtime), so an unchanged file is not
+    sampled twice in a run.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    encoding = _detected.get(key)
+    if encoding is None:
+        with open(file_path, "rb") as f:
+            sample = f.read(sample_bytes + 1)
+        encoding = detect_encoding_from_sample(sample[:sample_bytes], complete=len(sample) <= sample_bytes)
+        _detected[key] = encoding
+    return encoding
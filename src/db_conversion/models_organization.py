@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from src.db_conversion.pg_controller import Base
 
@@ -8,6 +8,8 @@ class Organization(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     organization_name = Column(String)
+    # normalize_organization_name(organization_name); unique, the upsert key.
+    normalized_name = Column(String)
     company_overview = Column(Text)
     business_activities = Column(Text)
     history = Column(Text)
@@ -20,3 +22,8 @@ class Organization(Base):
 
     # One-to-one or one-to-many depending on your requirement
     person = relationship("Person", back_populates="organization", uselist=False)
+
+    __table_args__ = (
+        Index("ux_organization_normalized_name", "normalized_name", unique=True),
+        Index("ix_organization_organization_name", "organization_name"),
+    )
@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from src.db_conversion.pg_controller import Base
 
@@ -8,6 +8,8 @@ class Person(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     person_name = Column(String)
+    # normalize_name(person_name); unique per organization, the upsert key.
+    normalized_name = Column(String)
     title = Column(String)
     career_history = Column(Text)
     current_activities = Column(Text)
@@ -15,3 +17,8 @@ class Person(Base):
     organization_id = Column(Integer, ForeignKey("organization.id", ondelete="SET NULL"))
 
     organization = relationship("Organization", back_populates="person")
+
+    __table_args__ = (
+        Index("ux_person_organization_normalized_name", "organization_id", "normalized_name", unique=True),
+        Index("ix_person_person_name", "person_name"),
+    )
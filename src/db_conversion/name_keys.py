@@ -0,0 +1,31 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Legal-form designators dropped from organization keys. ㈱/㈲ become (株)/(有) under NFKC.
+_LEGAL_FORMS = re.compile(
+    r"株式会社|有限会社|合同会社|合資会社|合名会社|一般社団法人|一般財団法人|\(株\)|\(有\)|\(同\)"
+)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """
+    Dedup key of a person name: NFKC (full-width → half-width, compatibility
+    characters folded), lower-cased, all whitespace removed. None for empty names.
+    """
+    if not name:
+        return None
+    key = _SPACES.sub("", unicodedata.normalize("NFKC", name)).lower()
+    return key or None
+
+
+def normalize_organization_name(name: Optional[str]) -> Optional[str]:
+    """
+    Dedup key of an organization name, so "株式会社ハナムラオプティクス",
+    "ハナムラオプティクス（株）" and "㈱ハナムラ オプティクス" share one key.
+    """
+    if not name:
+        return None
+    key = _LEGAL_FORMS.sub("", unicodedata.normalize("NFKC", name))
+    return normalize_name(key)
@@ -0,0 +1,174 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.hash_utils import hash_file, hash_text
+
+# Bump when the staged layout or the parsing rules change, so old entries are not reused.
+STAGING_VERSION = "2"
+INDEX_FILE = "_index.json"
+# Part name of a CSV file's only table; workbook parts are sheet names.
+CSV_PART = ""
+
+
+def frame_to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a DataFrame to an Arrow table. Object columns mixing types (common in
+    spreadsheets) are stored as strings; missing values stay null.
+    """
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        df = df.copy()
+        for column in df.columns[df.dtypes == object]:
+            df[column] = df[column].map(lambda v: None if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _writer_schema(schema: pa.Schema, as_text: bool = False) -> pa.Schema:
+    """
+    Schema a part is written with, taken from its first batch. Columns empty in that
+    batch were inferred as ``null``, which no later value can be cast to; they are
+    stored as strings instead (every column is with ``as_text``).
+    """
+    return pa.schema(
+        [f.with_type(pa.string()) if as_text or pa.types.is_null(f.type) else f for f in schema],
+        metadata=schema.metadata,
+    )
+
+
+class ParquetStaging:
+    """
+    Columnar staging area between structured sources and SQLite.
+
+    Each CSV file or workbook sheet is parsed once and stored as a Parquet file,
+    keyed by the source's content hash and the part (sheet name, or CSV_PART for
+    a CSV). Entries do not depend on the file name: copies of the same content
+    share them, and the loader picks the table names. Later loads of the same
+    content read the Arrow tables back instead of parsing text again. Analytics
+    code can read the Parquet files directly; ``staged_paths`` maps a source file
+    to them.
+
+    Layout::
+
+        <staging_dir>/v<STAGING_VERSION>/<hash[:2]>/<hash>/_index.json
+        <staging_dir>/v<STAGING_VERSION>/<hash[:2]>/<hash>/<part hash>.parquet
+
+    The index is written last, so an entry without one is incomplete and ignored.
+    """
+
+    def __init__(self, staging_dir, compression: str = "zstd"):
+        """
+        :param staging_dir: Directory holding the staged Parquet files.
+        :param compression: Parquet compression codec.
+        """
+        self.root_dir = Path(staging_dir)
+        self.staging_dir = self.root_dir / f"v{STAGING_VERSION}"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+
+    def entry_dir(self, file_hash: str) -> Path:
+        return self.staging_dir / file_hash[:2] / file_hash
+
+    @staticmethod
+    def _file_name(part: str) -> str:
+        return f"{hash_text(part)[:16]}.parquet"
+
+    def load_index(self, file_hash: str) -> Optional[dict]:
+        """
+        :return: {"source": ..., "parts": {part: parquet file name}} listing the
+                 non-empty parts in source order, or None when the content has not
+                 been staged completely.
+        """
+        path = self.entry_dir(file_hash) / INDEX_FILE
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def write_table(self, file_hash: str, part: str, batches: Iterable, as_text: bool = False) -> int:
+        """
+        Stream record batches, Arrow tables or DataFrames into one Parquet file.
+        Batches are cast to the schema of the first one, with its all-null columns
+        stored as strings (all columns with ``as_text``); the file is written to a
+        temporary path and renamed when complete.
+
+        :return: Number of rows written; nothing is written when there are no batches.
+        """
+        target = self.entry_dir(file_hash) / self._file_name(part)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        os.close(fd)
+        writer = None
+        rows = 0
+        try:
+            for batch in batches:
+                if isinstance(batch, pd.DataFrame):
+                    table = frame_to_arrow(batch)
+                elif isinstance(batch, pa.RecordBatch):
+                    table = pa.Table.from_batches([batch])
+                else:
+                    table = batch
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, _writer_schema(table.schema, as_text),
+                                              compression=self.compression)
+                if table.schema != writer.schema:
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+                rows += table.num_rows
+            if writer is None:
+                return 0
+            writer.close()
+            writer = None
+            os.replace(tmp_path, target)
+        finally:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return rows
+
+    def commit(self, file_hash: str, source, parts: Iterable[str]):
+        """Record a completely staged source; its parts become readable."""
+        entry = self.entry_dir(file_hash)
+        entry.mkdir(parents=True, exist_ok=True)
+        index = {
+            "source": str(source),
+            "parts": {part: self._file_name(part) for part in parts},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=entry, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, entry / INDEX_FILE)
+
+    def iter_frames(self, file_hash: str, part: str, batch_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Read a staged part back as DataFrames of at most ``batch_rows`` rows.
+        Yields nothing for a part that had no rows when it was staged.
+        """
+        path = self.entry_dir(file_hash) / self._file_name(part)
+        if not path.exists():
+            return
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_rows):
+            yield batch.to_pandas()
+
+    def staged_paths(self, file_path) -> Dict[str, Path]:
+        """
+        Parquet files staged for a source file, by part (sheet name, or CSV_PART),
+        e.g. for ``pd.read_parquet`` or DuckDB. Empty when the current content is
+        not staged.
+        """
+        file_hash = hash_file(file_path)
+        index = self.load_index(file_hash)
+        if index is None:
+            return {}
+        return {part: self.entry_dir(file_hash) / file_name for part, file_name in index["parts"].items()}
@@ -0,0 +1,171 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import pandas as pd
+
+# Column kinds and the SQLite type they are stored as. Dates are stored as ISO 8601
+# text, which sorts and compares correctly and works with SQLite's date functions.
+SQLITE_TYPES = {
+    "integer": "INTEGER",
+    "boolean": "INTEGER",
+    "float": "REAL",
+    "date": "TEXT",
+    "datetime": "TEXT",
+    "category": "TEXT",
+    "text": "TEXT",
+    "empty": "TEXT",
+}
+
+# 2024-01-05, 2024/1/5, 2024.01.05, 2024年1月5日, optionally followed by a time.
+_DATE_PATTERN = re.compile(r"^\d{4}[-/.年]\d{1,2}[-/.月]\d{1,2}日?(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?$")
+# camelCase ids (CustomerID, orderId) are matched case-sensitively, so paid/valid/guid are not keys.
+_KEY_NAME_PATTERN = re.compile(r"(^id$|_id$|^id_|(?-i:[a-z](?:ID|Id)$)|code$|コード|番号|ＩＤ|^no$|_no$)", re.IGNORECASE)
+_LEADING_ZERO = re.compile(r"^[+-]?0\d")
+
+
+@dataclass
+class ColumnSpec:
+    name: str
+    kind: str
+
+    @property
+    def sqlite_type(self) -> str:
+        return SQLITE_TYPES[self.kind]
+
+
+@dataclass
+class TableSchema:
+    """Column types of a table and the columns to index, as inferred from a sample."""
+    columns: List[ColumnSpec] = field(default_factory=list)
+    index_columns: List[str] = field(default_factory=list)
+
+    @property
+    def names(self) -> List[str]:
+        return [c.name for c in self.columns]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "TableSchema":
+        data = json.loads(text)
+        return cls(columns=[ColumnSpec(**c) for c in data["columns"]], index_columns=data["index_columns"])
+
+
+def _normalize_date_strings(values: pd.Series) -> pd.Series:
+    return values.str.replace(r"[年月]", "-", regex=True).str.replace("日", "", regex=False).str.replace(".", "-", regex=False)
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(_normalize_date_strings(values.astype(str).str.strip()), errors="coerce", format="mixed")
+
+
+def _infer_kind(values: pd.Series) -> str:
+    """Kind of one column from its non-null sample values."""
+    if values.empty:
+        return "empty"
+    if pd.api.types.is_bool_dtype(values):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(values):
+        return "integer"
+    if pd.api.types.is_float_dtype(values):
+        return "integer" if (values % 1 == 0).all() else "float"
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "date" if (values.dt.normalize() == values).all() else "datetime"
+
+    text = values.astype(str).str.strip()
+    # Codes such as 0012 or 03-1234-5678 must keep their leading zeros.
+    if not text.str.match(_LEADING_ZERO).any():
+        numbers = pd.to_numeric(text.str.replace(",", "", regex=False), errors="coerce")
+        if numbers.notna().all():
+            return "integer" if (numbers % 1 == 0).all() else "float"
+    if text.str.match(_DATE_PATTERN).all():
+        dates = _parse_dates(text)
+        if dates.notna().all():
+            return "date" if (dates.dt.normalize() == dates).all() else "datetime"
+    if len(text) >= 50 and text.nunique() <= max(20, len(text) // 20):
+        return "category"
+    return "text"
+
+
+def _is_key_candidate(name: str, kind: str, values: pd.Series, sample_size: int, position: int) -> bool:
+    if kind not in ("integer", "text") or values.empty:
+        return False
+    if _KEY_NAME_PATTERN.search(name):
+        return True
+    # A fully populated, unique and short first column is usually the record identifier.
+    return (position == 0 and len(values) == sample_size and values.is_unique
+            and values.astype(str).str.len().max() <= 64)
+
+
+def infer_schema(df: pd.DataFrame, sample_rows: int = 10_000, max_indexes: int = 3) -> TableSchema:
+    """
+    Infer a stable table schema from the first ``sample_rows`` rows.
+
+    Columns are typed as integer, float, boolean, date, datetime, category
+    (low-cardinality text) or text. Numbers with thousands separators are treated
+    as numbers; values with leading zeros stay text. Up to ``max_indexes`` likely
+    key columns (id/code/番号-like names, or a unique first column) are selected
+    for indexing.
+    """
+    sample = df.head(sample_rows)
+    schema = TableSchema()
+    for position, name in enumerate(sample.columns):
+        values = sample[name].dropna()
+        kind = _infer_kind(values)
+        schema.columns.append(ColumnSpec(name=str(name), kind=kind))
+        if len(schema.index_columns) < max_indexes and _is_key_candidate(str(name), kind, values, len(sample), position):
+            schema.index_columns.append(str(name))
+    return schema
+
+
+def coerce_frame(df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """
+    Convert a chunk to the schema's types before insertion. Values that do not fit
+    their column type are kept as they are (SQLite stores them as text), so no data
+    is lost when a later chunk disagrees with the sample.
+    """
+    df = df.copy()
+    for column in schema.columns:
+        values = df[column.name]
+        if column.kind in ("integer", "float") and values.dtype == object:
+            numbers = pd.to_numeric(values.astype(str).str.replace(",", "", regex=False), errors="coerce")
+            df[column.name] = numbers.astype(object).where(numbers.notna(), values)
+        elif column.kind in ("date", "datetime"):
+            dates = values if pd.api.types.is_datetime64_any_dtype(values) else _parse_dates(values)
+            fmt = "%Y-%m-%d" if column.kind == "date" else "%Y-%m-%d %H:%M:%S"
+            df[column.name] = dates.dt.strftime(fmt).astype(object).where(dates.notna(), values)
+        elif column.kind == "boolean":
+            # Built as object so missing values stay None instead of turning the column into floats.
+            df[column.name] = pd.Series([None if pd.isna(v) else int(bool(v)) for v in values],
+                                        index=values.index, dtype=object)
+    return df
+
+
+class SchemaStore:
+    """
+    Inferred schemas persisted in the database itself (table ``_etl_schema``), so
+    later appends to a table reuse its schema instead of re-inferring it.
+    """
+
+    TABLE = "_etl_schema"
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            "table_name TEXT PRIMARY KEY, schema TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+
+    def load(self, table_name: str) -> Optional[TableSchema]:
+        row = self.conn.execute(f"SELECT schema FROM {self.TABLE} WHERE table_name = ?", (table_name,)).fetchone()
+        return TableSchema.from_json(row[0]) if row else None
+
+    def save(self, table_name: str, schema: TableSchema):
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.TABLE} (table_name, schema, updated_at) VALUES (?, ?, ?)",
+            (table_name, schema.to_json(), datetime.now(timezone.utc).isoformat()),
+        )
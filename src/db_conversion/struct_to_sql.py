@@ -1,16 +1,297 @@
+import datetime
+import multiprocessing
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import sqlite3
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, islice
 from pathlib import Path
 
-class StructuredToSQL:
-    def __init__(self,db_path: str,files_dir:str=None,  use_dask: bool = False, threshold_mb: int = 100):
+try:  # Optional Rust-based reader, much faster than openpyxl when installed.
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+from src.db_conversion.encoding_detection import detect_encoding
+from src.db_conversion.parquet_staging import CSV_PART, ParquetStaging
+from src.db_conversion.schema_inference import SchemaStore, coerce_frame, infer_schema
+from src.hash_utils import hash_file
+
+
+def read_csv_arrow(file_path, encoding: str = "utf-8", block_size: int = 16 << 20, all_strings: bool = False):
+    """
+    Yield a CSV file as Arrow record batches using pyarrow's multithreaded
+    streaming reader. Column types are inferred from the first block; pass
+    ``all_strings=True`` to read every column as text when later blocks disagree.
+    Empty and duplicate header names are made unique like pandas does.
+    """
+    read_options = pa_csv.ReadOptions(encoding=encoding, block_size=block_size)
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+    if all_strings:
+        header = pa_csv.open_csv(file_path, read_options=read_options).schema.names
+        convert_options = pa_csv.ConvertOptions(
+            strings_can_be_null=True, column_types={name: pa.string() for name in header}
+        )
+    reader = pa_csv.open_csv(file_path, read_options=read_options, convert_options=convert_options)
+    names = unique_column_names(
+        [name if name else f"Unnamed: {i}" for i, name in enumerate(reader.schema.names)]
+    )
+    for batch in reader:
+        yield pa.RecordBatch.from_arrays(batch.columns, names=names)
+
+
+def unique_column_names(columns):
+    """
+    Make column names unique by appending suffixes like _1, _2, etc.
+    Example:
+    ['費用', '費用', '費用'] ➜ ['費用', '費用_1', '費用_2']
+    """
+    from collections import defaultdict
+
+    seen = defaultdict(int)
+    new_columns = []
+
+    for col in columns:
+        if seen[col]:
+            new_col = f"{col}_{seen[col]}"
+        else:
+            new_col = col
+        seen[col] += 1
+        new_columns.append(new_col)
+    return new_columns
+
+
+def list_sheet_names(file_path):
+    if CalamineWorkbook is not None:
+        return list(CalamineWorkbook.from_path(str(file_path)).sheet_names)
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _iter_sheet_rows(file_path, sheet_name):
+    """Yield the rows of a sheet as tuples of cell values, without loading the sheet."""
+    if CalamineWorkbook is not None:
+        sheet = CalamineWorkbook.from_path(str(file_path)).get_sheet_by_name(sheet_name)
+        yield from sheet.iter_rows()
+        return
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from workbook[sheet_name].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def detect_header_row(rows, min_filled_ratio: float = 0.8) -> int:
+    """
+    Index of the header row among the first rows of a sheet.
+
+    Business spreadsheets often start with a title row (e.g. "2024年度 売上一覧"),
+    a date or author line and blank rows before the real header. The header is
+    taken as the first row that fills at least ``min_filled_ratio`` of the widest
+    row and is mostly text.
+    """
+    filled = [[v for v in row if not _is_empty(v)] for row in rows]
+    widest = max((len(cells) for cells in filled), default=0)
+    if widest == 0:
+        return 0
+    wide_enough = [i for i, cells in enumerate(filled)
+                   if len(cells) >= max(min(2, widest), widest * min_filled_ratio)]
+    for i in wide_enough:
+        if sum(isinstance(v, str) for v in filled[i]) * 2 >= len(filled[i]):
+            return i
+    return wide_enough[0]
+
+
+def _cell_value(value, all_strings: bool):
+    if isinstance(value, str):
+        return value if value.strip() else None
+    if isinstance(value, (datetime.time, datetime.timedelta)):
+        # No SQLite/Arrow-friendly equivalent; keep the readable form.
+        return str(value)
+    if all_strings and value is not None:
+        return str(value)
+    return value
+
+
+def read_xlsx_sheet(file_path, sheet_name, batch_rows: int = 100_000, header_scan_rows: int = 20,
+                    all_strings: bool = False):
+    """
+    Yield one sheet as DataFrames of at most ``batch_rows`` rows, streaming rows
+    from a read-only workbook. The header row is detected among the first
+    ``header_scan_rows`` rows; title rows above it and fully empty rows are dropped.
+    ``all_strings=True`` reads every value as text.
+    """
+    rows = _iter_sheet_rows(file_path, sheet_name)
+    sample = [tuple(row) for row in islice(rows, header_scan_rows)]
+    if not sample:
+        return
+    header_ix = detect_header_row(sample)
+    # Read-only sheets often report trailing formatted-but-empty columns; keep used ones.
+    width = max((i + 1 for row in sample for i, v in enumerate(row) if not _is_empty(v)), default=0)
+    header = list(sample[header_ix][:width]) + [None] * (width - len(sample[header_ix][:width]))
+    columns = unique_column_names(
+        [f"Unnamed: {i}" if _is_empty(name) else str(name).strip() for i, name in enumerate(header)]
+    )
+
+    batch = []
+    for row in chain(sample[header_ix + 1:], rows):
+        values = [_cell_value(v, all_strings) for v in row[:width]]
+        if all(v is None for v in values):
+            continue
+        batch.append(values + [None] * (width - len(values)))
+        if len(batch) >= batch_rows:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
 
+def source_table_name(file_path, part: str = CSV_PART) -> str:
+    """SQLite table of a CSV file (file stem) or of a workbook sheet (stem_sheet), lower-cased."""
+    stem = Path(str(file_path).lower()).stem
+    return f"{stem}_{part}".lower() if part != CSV_PART else stem
+
+
+def _stage_sheet(staging_dir, file_path, file_hash, sheet_name, batch_rows) -> int:
+    """
+    Parse one sheet into the Parquet staging cache; runs in a worker process.
+
+    :return: Number of rows staged (0 for an empty sheet).
+    """
+    staging = ParquetStaging(staging_dir)
+    try:
+        rows = staging.write_table(file_hash, sheet_name, read_xlsx_sheet(file_path, sheet_name, batch_rows))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        # A later batch contradicted the column types of the first one.
+        print(f" Type inference failed for sheet '{sheet_name}' of {file_path} ({e}); staging it as text")
+        rows = staging.write_table(file_hash, sheet_name,
+                                   read_xlsx_sheet(file_path, sheet_name, batch_rows, all_strings=True),
+                                   as_text=True)
+    if not rows:
+        print(f"Skipped sheet '{sheet_name}' of {file_path} — sheet is empty")
+    return rows
+
+
+def _stage_csv(staging, file_path, file_hash, encoding=None):
+    """Parse a CSV once into the Parquet staging cache (encoding detected when None)."""
+    encoding = encoding or detect_encoding(file_path)
+    try:
+        staging.write_table(file_hash, CSV_PART, read_csv_arrow(file_path, encoding))
+    except pa.ArrowInvalid as e:
+        # A later block contradicted the types inferred from the first one.
+        print(f" Type inference failed for {file_path} ({e}); staging all columns as text")
+        staging.write_table(file_hash, CSV_PART, read_csv_arrow(file_path, encoding, all_strings=True), as_text=True)
+    staging.commit(file_hash, file_path, [CSV_PART])
+
+
+def _stage_file(staging_dir, file_path, chunk_rows):
+    """
+    Stage one CSV or workbook (all of its sheets) into the Parquet cache; runs in a
+    parser worker of StructuredToSQL.load_files.
+
+    :return: (content hash, staged parts: CSV_PART or the non-empty sheet names)
+    """
+    staging = ParquetStaging(staging_dir)
+    file_hash = hash_file(file_path)
+    index = staging.load_index(file_hash)
+    if index is not None:
+        return file_hash, list(index["parts"])
+    file_lower = str(file_path).lower()
+    if file_lower.endswith(".csv"):
+        _stage_csv(staging, file_path, file_hash)
+        return file_hash, [CSV_PART]
+    if file_lower.endswith((".xlsx", ".xlsm")):
+        parts = [sheet_name for sheet_name in list_sheet_names(file_path)
+                 if _stage_sheet(staging_dir, file_path, file_hash, sheet_name, chunk_rows)]
+        staging.commit(file_hash, file_path, parts)
+        return file_hash, parts
+    raise ValueError(f"Unsupported structured file: {file_path}")
+
+
+def _quote(identifier) -> str:
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _frame_rows(df):
+    """Rows of a DataFrame as lists of plain Python values, NaN → None."""
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+class _EmptyTable(Exception):
+    """Raised inside a load transaction when no row survived cleaning."""
+
+
+class StructuredToSQL:
+    def __init__(self,db_path: str,files_dir:str=None,  use_dask: bool = False, threshold_mb: int = 100,
+                 chunk_rows: int = 100_000, staging_dir=None, sheet_workers: int = 4):
+        """
+        :param db_path: Path to the SQLite database.
+        :param files_dir: Files handled by process_files.
+        :param use_dask: Kept for compatibility; CSVs of any size now go through the streaming loader.
+        :param threshold_mb: Kept for compatibility, see use_dask.
+        :param chunk_rows: Rows parsed and inserted per chunk by the streaming loader.
+        :param staging_dir: Directory of the Parquet staging cache; None parses the sources on every load
+                            (through a temporary staging directory).
+        :param sheet_workers: Processes parsing workbook sheets in parallel.
+        """
         self.files = files_dir
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # Autocommit mode: bulk loads open their transactions explicitly.
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
         self.use_dask = use_dask
         self.threshold_mb = threshold_mb
+        self.chunk_rows = chunk_rows
+        self.staging = ParquetStaging(staging_dir) if staging_dir else None
+        self.sheet_workers = sheet_workers
+        self._apply_bulk_pragmas()
+        self.schema_store = SchemaStore(self.conn)
+
+    def _apply_bulk_pragmas(self):
+        """
+        Bulk-load settings: WAL journal, fsync only at checkpoints, a 256 MB page
+        cache and in-memory temp storage.
+        """
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-262144")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+
+    @contextmanager
+    def _transaction(self):
+        if self.conn.in_transaction:
+            # Nested inside a larger transaction (load_files): isolate with a savepoint.
+            self.conn.execute("SAVEPOINT load")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK TO load")
+                self.conn.execute("RELEASE load")
+                raise
+            else:
+                self.conn.execute("RELEASE load")
+            return
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        else:
+            self.conn.execute("COMMIT")
 
     def _get_file_size_mb(self, filepath):
         return os.path.getsize(filepath) / (1024 * 1024)
@@ -26,20 +307,7 @@ class StructuredToSQL:
         Example:
         ['費用', '費用', '費用'] ➜ ['費用', '費用_1', '費用_2']
         """
-        from collections import defaultdict
-
-        seen = defaultdict(int)
-        new_columns = []
-
-        for col in df.columns:
-            if seen[col]:
-                new_col = f"{col}_{seen[col]}"
-            else:
-                new_col = col
-            seen[col] += 1
-            new_columns.append(new_col)
-
-        df.columns = new_columns
+        df.columns = unique_column_names(df.columns)
         return df
 
     
@@ -55,87 +323,241 @@ class StructuredToSQL:
         else:
             print(f"Skipped table '{table_name}' — cleaned DataFrame is empty")
 
-    def _load_with_pandas(self, file_path, table_name):
-        encodings_to_try = ['utf-8']#, 'shift_jis', 'iso-8859-1','cp932']
-        for encoding in encodings_to_try:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                print(f"→ DF Columns: {df.columns.tolist()}")
-                print("→ DF Preview:")
-                print(df.head(2))
-                self._insert_into_sql(df, table_name)
-                print(f"[pandas] Loaded '{file_path}' → table '{table_name}' using encoding '{encoding}'")
-                return
-            except UnicodeDecodeError as e:
-                print(f" Encoding '{encoding}' failed for {file_path}: {e}")
-            except Exception as e:
-                print(f"❌ Unexpected error for {file_path}: {e}")
-                return
-        print(f"❌ All encoding attempts failed for {file_path}")
+    def _write_frames(self, table_name, frames, mode="replace") -> int:
+        """
+        Stream DataFrame chunks into one table inside a single transaction.
+
+        The table is created with explicit column types inferred from the first
+        chunk (see schema_inference), every chunk is coerced to that schema and
+        written with executemany, and likely key columns are indexed after the
+        bulk insert. A failure rolls back the whole load, so a replaced table is
+        never left half-written. The schema is stored in ``_etl_schema`` and
+        reused when appending to an existing table.
 
-    def _load_with_dask(self, file_path, table_name):
-        import dask.dataframe as dd
+        :param table_name: Target table.
+        :param frames: Iterable of DataFrames sharing the same columns.
+        :param mode: "replace" drops the table first, "append" adds to it.
+        :return: Number of rows inserted.
+        """
+        total = 0
+        schema = None
+        insert_sql = None
         try:
-            sample = pd.read_csv(file_path, nrows=5)
-            print(f"→ Sample Columns: {sample.columns.tolist()}")
-            col_dtypes = {col: 'object' for col in sample.columns}
+            with self._transaction():
+                for df in frames:
+                    df = df.dropna(how='all')  # Drop fully empty rows
+                    if schema is None:
+                        df.columns = [str(c) for c in df.columns]
+                        if mode == "replace":
+                            self.conn.execute(f"DROP TABLE IF EXISTS {_quote(table_name)}")
+                        else:
+                            schema = self.schema_store.load(table_name)
+                            if schema is not None and schema.names != list(df.columns):
+                                raise ValueError(f"Columns of '{table_name}' differ from its stored schema")
+                        if schema is None:
+                            schema = infer_schema(df)
+                            self.schema_store.save(table_name, schema)
+                        column_defs = ", ".join(f"{_quote(c.name)} {c.sqlite_type}" for c in schema.columns)
+                        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table_name)} ({column_defs})")
+                        insert_sql = (
+                            f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in schema.names)}) "
+                            f"VALUES ({', '.join('?' * len(schema.columns))})"
+                        )
+                    else:
+                        df.columns = schema.names
+                    if df.empty:
+                        continue
+                    self.conn.executemany(insert_sql, _frame_rows(coerce_frame(df, schema)))
+                    total += len(df)
+                if total == 0:
+                    raise _EmptyTable()
+                for column in schema.index_columns:
+                    self.conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_{table_name}_{column}')} "
+                        f"ON {_quote(table_name)} ({_quote(column)})"
+                    )
+        except _EmptyTable:
+            print(f"Skipped table '{table_name}' — cleaned DataFrame is empty")
+        return total
 
-            ddf = dd.read_csv(file_path, blocksize="64MB", engine='python', dtype=col_dtypes)
+    def _staged_frames(self, file_hash, part, staging=None):
+        return (staging or self.staging).iter_frames(file_hash, part, batch_rows=self.chunk_rows)
 
-            for i in range(ddf.npartitions):
-                chunk = ddf.get_partition(i).compute()
-                mode = 'append' if i > 0 else 'replace'
-                self._insert_into_sql(chunk, table_name, mode=mode)
+    @contextmanager
+    def _parse_staging(self):
+        """
+        The staging cache, or a temporary one when it is disabled: every load parses
+        through Parquet, so serial and parallel loads (load_files) give the same tables.
+        """
+        if self.staging is not None:
+            yield self.staging
+            return
+        with tempfile.TemporaryDirectory(prefix="etl_staging_") as tmp_dir:
+            yield ParquetStaging(tmp_dir)
 
-            print(f"[dask] Loaded '{file_path}' → table '{table_name}'")
-        except Exception as e:
-            print(f"❌ Failed to load {file_path} with Dask: {e}")
+    def _stage(self, file_path, staging):
+        """
+        Stage a CSV or workbook unless its content is already staged. Workbook
+        sheets are parsed in parallel worker processes.
 
-    def _load_xlsx_with_pandas(self, file_path, table_name):
-        try:
-            excel_file = pd.ExcelFile(file_path, engine="openpyxl")
-            for sheet_name in excel_file.sheet_names:
-                df = excel_file.parse(sheet_name)
-                full_table_name = f"{table_name}_{sheet_name}".lower()
-                self._insert_into_sql(df, full_table_name)
-                print(f"[xlsx] Loaded sheet '{sheet_name}' from '{file_path}' → table '{full_table_name}'")
-        except Exception as e:
-            print(f"❌ Failed to load Excel file {file_path}: {e}")
+        :return: (content hash, staged parts)
+        """
+        file_hash = hash_file(file_path)
+        index = staging.load_index(file_hash)
+        if index is not None:
+            print(f"[load] Using staged Parquet for '{file_path}'")
+            return file_hash, list(index["parts"])
+        file_lower = str(file_path).lower()
+        if not file_lower.endswith((".xlsx", ".xlsm")) or self.sheet_workers <= 1:
+            return _stage_file(str(staging.root_dir), file_path, self.chunk_rows)
+        sheet_names = list_sheet_names(file_path)
+        tasks = [
+            (str(staging.root_dir), file_path, file_hash, sheet_name, self.chunk_rows)
+            for sheet_name in sheet_names
+        ]
+        if len(tasks) > 1:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.sheet_workers, len(tasks)), mp_context=context) as pool:
+                staged_rows = list(pool.map(_stage_sheet, *zip(*tasks)))
+        else:
+            staged_rows = [_stage_sheet(*task) for task in tasks]
+        parts = [sheet_name for sheet_name, rows in zip(sheet_names, staged_rows) if rows]
+        staging.commit(file_hash, file_path, parts)
+        return file_hash, parts
+
+    def _write_staged(self, file_path, file_hash, parts, staging) -> int:
+        """
+        Write the staged parts of one file to their tables in one transaction (a
+        savepoint inside load_files), so a failing file leaves no partial tables.
+
+        :return: Number of rows written.
+        """
+        total = 0
+        with self._transaction():
+            for part in parts:
+                table_name = source_table_name(file_path, part)
+                rows = self._write_frames(table_name, self._staged_frames(file_hash, part, staging))
+                total += rows
+                if rows:
+                    print(f"[load] Loaded '{file_path}' → table '{table_name}' ({rows} rows)")
+        return total
+
+    def load_file(self, file_path) -> int:
+        """
+        Load one CSV (encoding detected from a sample) or workbook (every non-empty
+        sheet into ``<stem>_<sheet>``). The source is parsed into Parquet once and
+        streamed into SQLite in chunks of ``chunk_rows``.
+
+        :return: Number of rows written.
+        :raises: Any parsing or database error; nothing of the file is kept then.
+        """
+        with self._parse_staging() as staging:
+            file_hash, parts = self._stage(file_path, staging)
+            return self._write_staged(file_path, file_hash, parts, staging)
+
+    def load_files(self, file_paths, workers: int = 4, max_pending: int = 8, commit_rows: int = 500_000,
+                   on_loaded=None) -> dict:
+        """
+        Load many CSV/XLSX files with parsing and writing overlapped.
+
+        A pool of parser processes stages the files into Parquet (the staging
+        cache, or a temporary one when it is disabled) while this thread, the only
+        SQLite writer, loads the staged tables. At most ``max_pending`` parsed files
+        wait for the writer. Files are written in input order, each in its own
+        savepoint, and committed together every ``commit_rows`` rows. Parsing is
+        the same as in ``load_file``, so the result is the same as loading the
+        files one by one. Files with identical content are parsed once.
+
+        :param file_paths: CSV/XLSX files to load.
+        :param workers: Number of parser processes.
+        :param max_pending: Files parsed ahead of the writer.
+        :param commit_rows: Rows written between commits.
+        :param on_loaded: Optional ``on_loaded(file_path, error)`` called once a file's rows are committed
+                          (error is None on success).
+        :return: Dict of failed file path → error message.
+        """
+        failures = {}
+        uncommitted = []
+
+        def commit():
+            self.conn.execute("COMMIT")
+            for file_path, error in uncommitted:
+                if on_loaded:
+                    on_loaded(file_path, error)
+            uncommitted.clear()
+
+        with self._parse_staging() as staging:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                # Same content is staged into the same entry: share one parse instead of racing on it.
+                staging_by_hash = {}
+
+                def submit(file_path):
+                    try:
+                        file_hash = hash_file(file_path)
+                    except OSError as e:
+                        future = Future()
+                        future.set_exception(e)
+                        return future
+                    if file_hash not in staging_by_hash:
+                        staging_by_hash[file_hash] = pool.submit(
+                            _stage_file, str(staging.root_dir), file_path, self.chunk_rows
+                        )
+                    return staging_by_hash[file_hash]
+
+                pending = deque()
+                paths = iter(file_paths)
+                for file_path in islice(paths, max_pending):
+                    pending.append((file_path, submit(file_path)))
+
+                rows_since_commit = 0
+                self.conn.execute("BEGIN")
+                try:
+                    while pending:
+                        file_path, future = pending.popleft()
+                        next_path = next(paths, None)
+                        if next_path is not None:
+                            pending.append((next_path, submit(next_path)))
+                        error = None
+                        try:
+                            file_hash, parts = future.result()
+                            rows_since_commit += self._write_staged(file_path, file_hash, parts, staging)
+                        except Exception as e:
+                            error = str(e)
+                            failures[str(file_path)] = error
+                            print(f"❌ Error processing {file_path}: {e}")
+                        uncommitted.append((file_path, error))
+                        if rows_since_commit >= commit_rows:
+                            commit()
+                            rows_since_commit = 0
+                            self.conn.execute("BEGIN")
+                    commit()
+                except BaseException:
+                    if self.conn.in_transaction:
+                        self.conn.execute("ROLLBACK")
+                    raise
+        return failures
 
     def process_files(self):
         for full_path in self.files:
-            file_lower = full_path.lower()
-            table_name = os.path.splitext(file_lower)[0]
-            file_size_mb = self._get_file_size_mb(full_path)
-            try:
-                if file_lower.endswith(".csv"):
-                    if self.use_dask or file_size_mb > self.threshold_mb:
-                        self._load_with_dask(full_path, table_name)
-                    else:
-                        self._load_with_pandas(full_path, table_name)
-                elif file_lower.endswith((".xlsx", ".xlsm")):
-                    self._load_xlsx_with_pandas(full_path, table_name)
-                else:
-                    print(f"⚠️ Skipping unsupported file: {full_path}")
-            except Exception as e:
-                print(f"❌ Error processing {full_path}: {e}")
+            self.process_individual_file(full_path)
 
     def process_individual_file(self,file_path=None):
-        file_lower = file_path.lower()
-        table_name = Path(file_lower).stem
-        file_size_mb = self._get_file_size_mb(file_path)
+        """
+        Load one CSV/XLSX file, printing instead of raising errors.
+
+        :return: None on success, otherwise the error message.
+        """
+        file_lower = str(file_path).lower()
+        if not file_lower.endswith((".csv", ".xlsx", ".xlsm")):
+            print(f"⚠️ Skipping unsupported file: {file_path}")
+            return f"Unsupported structured file: {file_path}"
         try:
-            if file_lower.endswith(".csv"):
-                if self.use_dask or file_size_mb > self.threshold_mb:
-                    self._load_with_dask(file_path, table_name)
-                else:
-                    self._load_with_pandas(file_path, table_name)
-            elif file_lower.endswith((".xlsx", ".xlsm")):
-                self._load_xlsx_with_pandas(file_path, table_name)
-            else:
-                print(f"⚠️ Skipping unsupported file: {file_path}")
+            self.load_file(file_path)
         except Exception as e:
             print(f"❌ Error processing {file_path}: {e}")
+            return str(e)
+        return None
 
     def close(self):
         self.conn.close()
@@ -1,13 +1,17 @@
 import time
+from importlib.metadata import version
 from pathlib import Path
-import yaml
-import json
 import pandas as pd
+import pypdfium2 as pdfium
 from src.logger import setup_logger
+from src.document_cache import DocumentCache
+from src.document_merge import merge_documents
+from src.hash_utils import hash_file, hash_json
+from src.pdf_triage import ROUTE_FULL, ROUTE_TEXT, TRIAGE_VERSION, choose_route, profile_pdf, text_layer_document
 
 from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
 from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
-from docling.datamodel.base_models import InputFormat
+from docling.datamodel.base_models import ConversionStatus, InputFormat
 from docling.document_converter import (
     DocumentConverter,
     PdfFormatOption,
@@ -16,33 +20,65 @@ from docling.document_converter import (
 from docling.datamodel.pipeline_options import PdfPipelineOptions
 from docling.pipeline.simple_pipeline import SimplePipeline
 from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline
-from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
-from docling_core.types.doc.document import DocItemLabel
-
-# Define which labels you DO want (exclude TABLE)
-labels_to_include = {
-    DocItemLabel.PARAGRAPH,
-    DocItemLabel.TEXT,
-    DocItemLabel.HANDWRITTEN_TEXT,
-    DocItemLabel.CAPTION,
-    DocItemLabel.CHART,
-    DocItemLabel.DOCUMENT_INDEX,
-    DocItemLabel.TITLE
-    # DocItemLabel.NUMBERED_LIST,
-    # DocItemLabel.IMAGE,  # optional
-    # don't include DocItemLabel.TABLE
-}
+from src.output_sinks import (
+    DocumentExport,
+    JsonSink,
+    MarkdownSink,
+    SinkDispatcher,
+    TableSink,
+    TextSink,
+    WeaviateSink,
+    YamlSink,
+    labels_to_include,
+)
 
 class DoclingConverter:
     def __init__(self,weaviate_client=None,
-                 struct_to_sql=None):
-        """ Initialize the DoclingConverter with optional Weaviate client and StructuredToSQL instance. """
+                 struct_to_sql=None,
+                 num_threads: int = 8,
+                 cache_dir=None,
+                 chunker=None,
+                 route_pdfs: bool = True):
+        """ Initialize the DoclingConverter with optional Weaviate client and StructuredToSQL instance.
+        :param num_threads: Threads used by the docling models of this converter.
+        :param cache_dir: Directory of the converted-document cache; None disables caching.
+        :param chunker: StructureChunker used to split documents before vectorization;
+                        None stores each document as a single Weaviate object.
+        :param route_pdfs: Convert born-digital text PDFs from their text layer instead
+                           of the layout/table models (see src.pdf_triage).
+        """
         self.struct_to_sql = struct_to_sql
         self.logger = setup_logger("etl_app")
+        self.num_threads = num_threads
+        self.pdf_pipeline_options = self._build_pdf_pipeline_options()
+        self.options_hash = self._options_hash()
+        self.text_options_hash = hash_json({
+            "route": ROUTE_TEXT,
+            "triage": TRIAGE_VERSION,
+            "docling_core": version("docling-core"),
+        })
+        self.route_pdfs = route_pdfs
         self.doc_converter = self._build_converter()
         self.weaviate_client = weaviate_client
+        self.cache_dir = cache_dir
+        self.document_cache = DocumentCache(cache_dir) if cache_dir else None
+        self.chunker = chunker
 
-    def _build_converter(self) -> DocumentConverter:
+    def _options_hash(self) -> str:
+        """
+        Hash of everything that changes the converted DoclingDocument: the docling
+        versions and the PDF pipeline options (threading excluded, it does not
+        change the output).
+        """
+        return hash_json({
+            "docling": version("docling"),
+            "docling_core": version("docling-core"),
+            "pdf": self.pdf_pipeline_options.model_dump(
+                mode="json", exclude={"accelerator_options", "artifacts_path"}
+            ),
+        })
+
+    def _build_pdf_pipeline_options(self) -> PdfPipelineOptions:
         pipeline_options = PdfPipelineOptions()
         pipeline_options.do_ocr = False
         pipeline_options.do_table_structure = True
@@ -55,9 +91,11 @@ class DoclingConverter:
         pipeline_options.images_scale = 2
         pipeline_options.do_picture_classification = True
         pipeline_options.accelerator_options = AcceleratorOptions(
-            num_threads=8, device=AcceleratorDevice.AUTO
+            num_threads=self.num_threads, device=AcceleratorDevice.AUTO
         )
+        return pipeline_options
 
+    def _build_converter(self) -> DocumentConverter:
         return DocumentConverter(
             allowed_formats=[
                 InputFormat.PDF,
@@ -72,7 +110,7 @@ class DoclingConverter:
             ],
             format_options={
                 InputFormat.PDF: PdfFormatOption(
-                    pipeline_options=pipeline_options,
+                    pipeline_options=self.pdf_pipeline_options,
                     pipeline_cls=StandardPdfPipeline,
                     backend=PyPdfiumDocumentBackend,
                 ),
@@ -82,6 +120,181 @@ class DoclingConverter:
             },
         )
 
+    def route(self, path) -> str:
+        """
+        Conversion route of a file: ROUTE_TEXT for PDFs whose text layer is enough,
+        ROUTE_FULL for everything else. The decision is logged.
+        """
+        if not self.route_pdfs or Path(path).suffix.lower() != ".pdf":
+            return ROUTE_FULL
+        try:
+            route, reason = choose_route(profile_pdf(path))
+        except Exception as e:
+            route, reason = ROUTE_FULL, f"triage failed: {e}"
+        self.logger.info(f"🔀 Route {route} for {Path(path).name}: {reason}")
+        return route
+
+    def _convert_text_route(self, path, file_hash=None):
+        if file_hash and self.document_cache is not None:
+            document = self.document_cache.get(file_hash, self.text_options_hash)
+            if document is not None:
+                self.logger.info(f"♻️ Loaded from document cache: {Path(path).name}")
+                return document
+        document = text_layer_document(path)
+        if file_hash and self.document_cache is not None:
+            try:
+                self.document_cache.put(file_hash, self.text_options_hash, document)
+            except Exception as e:
+                self.logger.warning(f"Could not cache converted document {path}: {e}")
+        return document
+
+    def shard_ranges(self, path, shard_pages: int, min_pages: int):
+        """
+        Page ranges to convert a large PDF in, or None to convert it in one pass:
+        non-PDFs, PDFs under ``min_pages`` pages, cached documents and text-route
+        documents are not sharded.
+
+        :return: List of 1-based inclusive (first_page, last_page) tuples.
+        """
+        if not shard_pages or Path(path).suffix.lower() != ".pdf":
+            return None
+        try:
+            pdf = pdfium.PdfDocument(str(path))
+            try:
+                page_count = len(pdf)
+            finally:
+                pdf.close()
+        except Exception:
+            return None
+        if page_count < max(min_pages, 2 * shard_pages):
+            return None
+        if self.document_cache is not None and self.document_cache.contains(hash_file(path), self.options_hash):
+            return None
+        if self.route(path) == ROUTE_TEXT:
+            return None
+        return [(start, min(start + shard_pages - 1, page_count)) for start in range(1, page_count + 1, shard_pages)]
+
+    def convert_page_range(self, path, page_range):
+        """
+        Convert one page range of a PDF with the full pipeline, for sharded conversion.
+        Pages keep their numbers in the source document.
+
+        :return: (DoclingDocument or None, error message or None)
+        """
+        res = self.doc_converter.convert(path, raises_on_error=False, page_range=tuple(page_range))
+        if res.status not in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS):
+            return None, "; ".join(e.error_message for e in res.errors) or str(res.status)
+        return res.document, None
+
+    def merge_shards(self, path, fragments):
+        """
+        Merge the page-range fragments of a sharded PDF and cache the result like a
+        single-pass conversion.
+        """
+        document = merge_documents(fragments)
+        if self.document_cache is not None:
+            try:
+                self.document_cache.put(hash_file(path), self.options_hash, document)
+            except Exception as e:
+                self.logger.warning(f"Could not cache converted document {path}: {e}")
+        return document
+
+    def iter_documents(self, input_paths):
+        """
+        Convert documents with docling and yield them one by one.
+
+        Born-digital text PDFs are built from their text layer (see route); the rest
+        goes through a single convert_all call so docling can reuse its pipeline and
+        page batching across documents. A failing document does not stop the others;
+        it is yielded with its error.
+
+        :param input_paths: List of file paths to convert.
+        :return: Generator of (source_path, DoclingDocument or None, error message or None).
+        """
+        to_convert = []
+        file_hashes = {}
+        for p in input_paths:
+            if self.document_cache is not None:
+                try:
+                    file_hashes[p] = hash_file(p)
+                except OSError as e:
+                    yield p, None, str(e)
+                    continue
+            if self.route(p) == ROUTE_TEXT:
+                try:
+                    yield p, self._convert_text_route(p, file_hashes.get(p)), None
+                    continue
+                except Exception as e:
+                    self.logger.warning(f"Text-layer conversion failed for {p} ({e}); using the full pipeline.")
+            if self.document_cache is None:
+                to_convert.append(p)
+                continue
+            document = self.document_cache.get(file_hashes[p], self.options_hash)
+            if document is not None:
+                self.logger.info(f"♻️ Loaded from document cache: {Path(p).name}")
+                yield p, document, None
+            else:
+                to_convert.append(p)
+        if not to_convert:
+            return
+
+        sources = {str(Path(p)): p for p in to_convert}
+        done = set()
+        try:
+            conv_results = self.doc_converter.convert_all(to_convert, raises_on_error=False)
+            for res in conv_results:
+                source = sources.get(str(res.input.file), str(res.input.file))
+                done.add(source)
+                if res.status not in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS):
+                    errors = "; ".join(e.error_message for e in res.errors) or str(res.status)
+                    yield source, None, errors
+                    continue
+                if source in file_hashes:
+                    try:
+                        self.document_cache.put(file_hashes[source], self.options_hash, res.document)
+                    except Exception as e:
+                        self.logger.warning(f"Could not cache converted document {source}: {e}")
+                yield source, res.document, None
+        except Exception as e:
+            remaining = [p for p in to_convert if p not in done]
+            if len(to_convert) == 1:
+                for p in remaining:
+                    yield p, None, str(e)
+                return
+            # Something outside docling's per-document error handling broke the batch;
+            # retry the rest one by one so only the bad file fails.
+            self.logger.warning(f"Batch conversion aborted ({e}); retrying {len(remaining)} files individually.")
+            for p in remaining:
+                yield from self.iter_documents([p])
+
+    def build_sinks(
+        self,
+        output_dir=Path("scratch"),
+        table_extraction=False,
+        save_VectorDB=False,
+        save_markdown=False,
+        save_yaml=False,
+        save_text=False,
+        save_json=False,
+    ):
+        """
+        Return the output sinks enabled by the given flags, in write order.
+        """
+        sinks = []
+        if table_extraction:
+            sinks.append(TableSink(self, output_dir))
+        if save_VectorDB:
+            sinks.append(WeaviateSink(self.weaviate_client, chunker=self.chunker))
+        if save_markdown:
+            sinks.append(MarkdownSink(output_dir, without_tables=table_extraction))
+        if save_text:
+            sinks.append(TextSink(output_dir))
+        if save_yaml:
+            sinks.append(YamlSink(output_dir))
+        if save_json:
+            sinks.append(JsonSink(output_dir))
+        return sinks
+
     def convert_documents(
         self,
         input_paths,
@@ -93,63 +306,64 @@ class DoclingConverter:
         save_text=False,
         save_json=False,
     ):
+        """
+        Convert documents and write them to the enabled outputs.
+
+        Each representation is serialized once per document and the sink writes
+        overlap with the conversion of the next document.
+
+        :return: Dict mapping each failed source path to its error message.
+        """
         start_time = time.time()
-        conv_results = self.doc_converter.convert_all(input_paths)
-        for i,res in enumerate(conv_results):
-            stem = res.input.file.stem
-            if table_extraction:
-                self.table_extraction(res,output_dir)
-            self.logger.info(f"✅ Document converted: {res.input.file.name}")
-            self.logger.debug(res.document._export_to_indented_text(max_text_len=16))
-            if save_VectorDB:
-                self.logger.info("VectorDB saving is enabled")
-                serializer = MarkdownDocSerializer(doc=res.document)
-                ser_result = serializer.serialize()
-                ser_text = ser_result.text
-                self.weaviate_client.insert_data_from_lists(
-                    texts=[ser_text],
-                    sources=[input_paths[i]]
-                )
-            if save_markdown:
-                md_path = output_dir / f"{stem}.md"
-                if table_extraction:
-                    md_text = res.document.export_to_markdown(labels=labels_to_include)
-                else:
-                    md_text = res.document.export_to_markdown()
-                md_path.write_text(md_text, encoding="utf-8")
-                self.logger.info(f"   Markdown saved → {md_path}")
-
-            if save_text:
-                txt_path = output_dir / f"{stem}.txt"
-                txt_text = res.document.export_to_text()
-                txt_path.write_text(txt_text, encoding="utf-8")
-                self.logger.info(f"   Text saved → {txt_path}")
-
-            if save_yaml:
-                yaml_path = output_dir / f"{stem}.yaml"
-                yaml_text = yaml.safe_dump(res.document.export_to_dict())
-                yaml_path.write_text(yaml_text, encoding="utf-8")
-                self.logger.info(f"   YAML saved → {yaml_path}")
-
-            if save_json:
-                json_path = output_dir / f"{stem}.json"
-                json_text = json.dumps(res.document.export_to_dict(), ensure_ascii=False, indent=2)
-                json_path.write_text(json_text, encoding="utf-8")
-                self.logger.info(f"   JSON saved → {json_path}")
+        failures = {}
+        sinks = self.build_sinks(
+            output_dir=output_dir,
+            table_extraction=table_extraction,
+            save_VectorDB=save_VectorDB,
+            save_markdown=save_markdown,
+            save_yaml=save_yaml,
+            save_text=save_text,
+            save_json=save_json,
+        )
+
+        def on_written(export, errors):
+            if errors:
+                failures[export.source] = "; ".join(f"{k}: {v}" for k, v in errors.items())
+
+        with SinkDispatcher(sinks) as dispatcher:
+            for source, document, error in self.iter_documents(input_paths):
+                if error:
+                    self.logger.error(f"❌ Conversion failed: {source}: {error}")
+                    failures[source] = error
+                    continue
+                self.logger.info(f"✅ Document converted: {Path(source).name}")
+                dispatcher.submit(DocumentExport(document, source), callback=on_written)
 
         self.logger.info(f"Total time taken: {time.time() - start_time:.2f} seconds")
+        return failures
+
+    def export_document(self, document, source, output_dir=Path("scratch"), **flags):
+        """
+        Write one converted DoclingDocument to the enabled outputs, synchronously.
+
+        :param document: Converted DoclingDocument.
+        :param source: Source file path, stored alongside the vectors.
+        :param flags: Output flags, see build_sinks.
+        """
+        export = DocumentExport(document, source)
+        for sink in self.build_sinks(output_dir=output_dir, **flags):
+            sink.write(export)
 
-    def table_extraction(self, res, output_dir):
+    def table_extraction(self, document, stem, output_dir):
         """
         Extract tables from a document and save them as CSV files.
         """
-        stem = res.input.file.stem
-        for table_ix, table in enumerate(res.document.tables):
+        for table_ix, table in enumerate(document.tables):
             table_df: pd.DataFrame = table.export_to_dataframe()
             print(f"## Table {table_ix}")
             print(table_df.to_markdown())
             if table_df.shape[0]==0 or table_df.shape[1]==0:
-                self.logger.warning(f"Empty table found in {res.input.file.name}, skipping export.")
+                self.logger.warning(f"Empty table found in {stem}, skipping export.")
                 continue
             
             # Save the table as csv
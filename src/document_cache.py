@@ -0,0 +1,74 @@
+import gzip
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from docling_core.types.doc.document import DoclingDocument
+
+from src.logger import setup_logger
+
+
+class DocumentCache:
+    """
+    On-disk cache of converted DoclingDocuments.
+
+    Entries are gzip-compressed JSON keyed by the source file's content hash and a
+    hash of the docling pipeline options, so turning on a new output re-exports from
+    the cache instead of re-running the layout/table models. Changing the pipeline
+    options writes to a new key space; old entries are simply never read again.
+    """
+
+    def __init__(self, cache_dir, compress_level: int = 6):
+        """
+        Initialize the DocumentCache.
+
+        :param cache_dir: Directory that holds the cache entries.
+        :param compress_level: gzip compression level (1 fastest - 9 smallest).
+        """
+        self.logger = setup_logger("etl_app")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.compress_level = compress_level
+
+    def _path(self, file_hash: str, options_hash: str) -> Path:
+        return self.cache_dir / options_hash[:16] / file_hash[:2] / f"{file_hash}.json.gz"
+
+    def contains(self, file_hash: str, options_hash: str) -> bool:
+        """Whether a document is cached, without loading it."""
+        return self._path(file_hash, options_hash).exists()
+
+    def get(self, file_hash: str, options_hash: str) -> Optional[DoclingDocument]:
+        """
+        Load a cached document.
+
+        :return: The DoclingDocument, or None on a miss or an unreadable entry.
+        """
+        path = self._path(file_hash, options_hash)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return DoclingDocument.model_validate_json(f.read())
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable document cache entry {path}: {e}")
+            return None
+
+    def put(self, file_hash: str, options_hash: str, document: DoclingDocument):
+        """
+        Store a converted document. The entry is written to a temporary file and
+        renamed, so concurrent workers never see a half-written entry.
+        """
+        path = self._path(file_hash, options_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb", compresslevel=self.compress_level
+            ) as f:
+                f.write(document.model_dump_json().encode("utf-8"))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,56 @@
+import re
+from typing import List
+
+from docling_core.types.doc.document import DoclingDocument
+
+# Item collections of a DoclingDocument; items reference each other as "#/<collection>/<index>".
+_COLLECTIONS = ("groups", "texts", "pictures", "tables", "key_value_items", "form_items")
+_REF = re.compile(r"^#/(" + "|".join(_COLLECTIONS) + r")/(\d+)$")
+_REF_KEYS = ("self_ref", "$ref", "cref")
+
+
+def _shift_refs(value, offsets: dict):
+    """Shift every item reference in a serialized document by its collection's offset, in place."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in _REF_KEYS and isinstance(item, str):
+                match = _REF.match(item)
+                if match:
+                    value[key] = f"#/{match.group(1)}/{int(match.group(2)) + offsets[match.group(1)]}"
+            else:
+                _shift_refs(item, offsets)
+    elif isinstance(value, list):
+        for item in value:
+            _shift_refs(item, offsets)
+
+
+def _first_page(document: DoclingDocument) -> int:
+    return min(document.pages) if document.pages else 0
+
+
+def merge_documents(fragments: List[DoclingDocument]) -> DoclingDocument:
+    """
+    Merge DoclingDocuments converted from page ranges of one source back into a
+    single document, in page order.
+
+    Docling keeps the source page numbers when converting a page range, so the
+    pages of the fragments do not overlap. Items of each fragment are appended
+    after those of the previous ones with their references renumbered, and the
+    body/furniture children are concatenated, which gives the tree a single-pass
+    conversion builds.
+    """
+    if not fragments:
+        raise ValueError("No document fragments to merge")
+    fragments = sorted(fragments, key=_first_page)
+    merged = fragments[0].export_to_dict()
+    for fragment in fragments[1:]:
+        data = fragment.export_to_dict()
+        offsets = {name: len(merged.get(name) or []) for name in _COLLECTIONS}
+        _shift_refs(data, offsets)
+        for name in _COLLECTIONS:
+            merged.setdefault(name, []).extend(data.get(name) or [])
+        for node in ("body", "furniture"):
+            if node in data:
+                merged[node]["children"].extend(data[node].get("children") or [])
+        merged["pages"].update(data.get("pages") or {})
+    return DoclingDocument.model_validate(merged)
@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from src.hash_utils import hash_text
+from src.logger import setup_logger
+
+# embed_fn(texts, task) -> one vector per text
+EmbedFn = Callable[[List[str], Optional[str]], List[List[float]]]
+
+PASSAGE_TASK = "retrieval.passage"
+QUERY_TASK = "retrieval.query"
+
+
+def jina_embed_fn(model: str, api_key: str, timeout: int = 60) -> EmbedFn:
+    """
+    Return an embed_fn calling the Jina embeddings API, with the same task
+    conventions as Weaviate's text2vec-jinaai module.
+    """
+    def embed(texts, task=None):
+        payload = {"model": model, "input": texts}
+        if task:
+            payload["task"] = task
+        response = requests.post(
+            "https://api.jina.ai/v1/embeddings",
+            json=payload,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda d: d["index"])
+        return [d["embedding"] for d in data]
+    return embed
+
+
+def openai_embed_fn(model: str, api_key: str, timeout: int = 60) -> EmbedFn:
+    """
+    Return an embed_fn calling the OpenAI embeddings API (the task is ignored).
+    """
+    def embed(texts, task=None):
+        response = requests.post(
+            "https://api.openai.com/v1/embeddings",
+            json={"model": model, "input": texts},
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda d: d["index"])
+        return [d["embedding"] for d in data]
+    return embed
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk store of embedding vectors.
+
+    Keys are hashes of (provider, model, task, text), so the same text embedded with
+    the same model is never paid for twice, across runs, re-created collections
+    and environments (the cache file can be copied along).
+    """
+
+    def __init__(self, cache_path):
+        """
+        :param cache_path: Path to the SQLite file holding the vectors.
+        """
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(provider: str, model: str, text: str, task: Optional[str] = None) -> str:
+        return hash_text(f"{provider}\x00{model}\x00{task or ''}\x00{text}")
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters; look up in slices.
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()],
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedEmbedder:
+    """
+    Embeds texts through an EmbeddingCache: cached vectors are returned directly and
+    only the misses are sent to ``embed_fn``, in batches.
+    """
+
+    def __init__(self, embed_fn: EmbedFn, provider: str, model: str,
+                 cache: Optional[EmbeddingCache] = None, batch_size: int = 64):
+        """
+        :param embed_fn: ``embed_fn(texts, task) -> vectors``; any local function works.
+        :param provider: Provider name, part of the cache key.
+        :param model: Model name, part of the cache key.
+        :param cache: EmbeddingCache; None embeds every call.
+        :param batch_size: Maximum number of texts per embed_fn call.
+        """
+        self.logger = setup_logger("etl_app")
+        self.embed_fn = embed_fn
+        self.provider = provider
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts: List[str], task: Optional[str] = PASSAGE_TASK) -> List[List[float]]:
+        """
+        Return one vector per text, embedding only the texts not in the cache.
+        """
+        keys = [EmbeddingCache.key(self.provider, self.model, text, task) for text in texts]
+        vectors = self.cache.get_many(list(set(keys))) if self.cache else {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        self.hits += len(keys) - sum(1 for key in keys if key in missing)
+        self.misses += len(missing)
+
+        missing_items = list(missing.items())
+        for i in range(0, len(missing_items), self.batch_size):
+            part = missing_items[i:i + self.batch_size]
+            embedded = self.embed_fn([text for _, text in part], task)
+            new_vectors = {key: vector for (key, _), vector in zip(part, embedded)}
+            if self.cache:
+                self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+        return [vectors[key] for key in keys]
@@ -0,0 +1,91 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Type, Union
+
+from pydantic import BaseModel
+
+from src.hash_utils import hash_json
+
+
+def schema_hash(extraction_schema: Union[Type[BaseModel], dict]) -> str:
+    """
+    Hash of an extraction schema: a Pydantic model's JSON schema (field names,
+    types and descriptions) or a JSON-schema dict such as config/organization_schema.json.
+    """
+    if isinstance(extraction_schema, dict):
+        return hash_json(extraction_schema)
+    return hash_json(extraction_schema.model_json_schema())
+
+
+class ExtractionCache:
+    """
+    Persistent store of structured extraction results.
+
+    Entries are keyed by the document's content hash and the extraction schema's
+    hash. Editing a schema only invalidates the entries extracted with it; results
+    of other schemas keep hitting, and a cache hit never touches the network.
+    """
+
+    def __init__(self, cache_path):
+        """
+        :param cache_path: Path to the SQLite file holding the results.
+        """
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "file_hash TEXT NOT NULL, schema_hash TEXT NOT NULL, schema_title TEXT, "
+            "result TEXT NOT NULL, created_at TEXT NOT NULL, "
+            "PRIMARY KEY (file_hash, schema_hash))"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_hash: str, schema_key: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result FROM extractions WHERE file_hash = ? AND schema_hash = ?",
+                (file_hash, schema_key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, file_hash: str, schema_key: str, result: dict, schema_title: Optional[str] = None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions (file_hash, schema_hash, schema_title, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (file_hash, schema_key, schema_title, json.dumps(result, ensure_ascii=False),
+                 datetime.now(timezone.utc).isoformat()),
+            )
+            self.conn.commit()
+
+    def prune(self, schema_title: str, keep_schema_hashes: Iterable[str]) -> int:
+        """
+        Delete the entries of a schema (by title) extracted with any other version
+        than ``keep_schema_hashes``.
+
+        :return: Number of deleted entries.
+        """
+        keep = list(keep_schema_hashes)
+        with self._lock:
+            cursor = self.conn.execute(
+                f"DELETE FROM extractions WHERE schema_title = ? "
+                f"AND schema_hash NOT IN ({','.join('?' * len(keep))})",
+                (schema_title, *keep),
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
@@ -48,6 +48,38 @@ class FileLoader:
 
         return matched_files
 
+    def batch_by_format(self, files: List[str], max_files: int = 16, max_mb: float = 200) -> List[List[str]]:
+        """
+        Group files into conversion batches of a single format and bounded size.
+
+        Files are sorted by size within each format so small files share a batch and
+        one huge file does not hold many small ones back.
+
+        :param files: File paths to group.
+        :param max_files: Maximum number of files per batch.
+        :param max_mb: Maximum total size (MB) per batch; a larger single file gets its own batch.
+        :return: List of batches (lists of file paths).
+        """
+        by_format = {}
+        for file_path in files:
+            _, ext = os.path.splitext(file_path)
+            by_format.setdefault(ext.lower(), []).append(file_path)
+
+        batches = []
+        for ext in sorted(by_format):
+            sized = sorted(by_format[ext], key=os.path.getsize)
+            batch, batch_mb = [], 0.0
+            for file_path in sized:
+                size_mb = os.path.getsize(file_path) / (1024 * 1024)
+                if batch and (len(batch) >= max_files or batch_mb + size_mb > max_mb):
+                    batches.append(batch)
+                    batch, batch_mb = [], 0.0
+                batch.append(file_path)
+                batch_mb += size_mb
+            if batch:
+                batches.append(batch)
+        return batches
+
 
 # Example usage:
 if __name__ == "__main__":
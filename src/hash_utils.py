@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Return the sha256 hex digest of a bytes object.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """
+    Return the sha256 hex digest of a string (UTF-8 encoded).
+    """
+    return hash_bytes(text.encode("utf-8"))
+
+
+def hash_json(value) -> str:
+    """
+    Return a stable sha256 hex digest of a JSON serialisable value.
+    Keys are sorted so that dict ordering does not change the digest.
+    """
+    return hash_text(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str))
+
+
+@lru_cache(maxsize=4096)
+def _hash_file_cached(path: str, size: int, mtime_ns: int, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_file(file_path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Return the sha256 hex digest of a file's content.
+
+    The file is streamed in fixed-size blocks, and the digest is memoised on
+    (path, size, mtime) so the manifest, caches and loaders that all key on the
+    content hash only read a file once per process.
+
+    :param file_path: Path to the file.
+    :param chunk_size: Read block size in bytes.
+    :return: Hex digest string.
+    """
+    path = os.fspath(file_path)
+    stat = os.stat(path)
+    return _hash_file_cached(os.path.abspath(path), stat.st_size, stat.st_mtime_ns, chunk_size)
@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.hash_utils import hash_file
+from src.logger import setup_logger
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# Files the pipeline recognised but has no sink for (images, unsupported formats).
+STATUS_SKIPPED = "skipped"
+
+FILE_NEW = "new"
+FILE_CHANGED = "changed"
+FILE_UNCHANGED = "unchanged"
+
+
+class FileManifest:
+    """
+    Persistent record of every file the ETL pipeline has processed.
+
+    One row per source path holds the size, mtime, content hash, the pipeline/config
+    version it was processed with and the status of every sink (weaviate, markdown,
+    sqlite, postgres ...). The path is the primary key, so the unchanged check is a
+    single indexed lookup plus an ``os.stat``; the file is only hashed when its size
+    or mtime moved.
+    """
+
+    def __init__(self, manifest_path, pipeline_version: str):
+        """
+        Initialize the manifest.
+
+        :param manifest_path: Path to the SQLite file backing the manifest.
+        :param pipeline_version: Version string of the pipeline/config. Files processed
+                                 with another version are treated as changed.
+        """
+        self.logger = setup_logger("etl_app")
+        self.manifest_path = Path(manifest_path)
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pipeline_version = pipeline_version
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.manifest_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                pipeline_version TEXT NOT NULL,
+                sink_status TEXT NOT NULL DEFAULT '{}',
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def _get_row(self, path: str) -> Optional[tuple]:
+        return self.conn.execute(
+            "SELECT size, mtime_ns, content_hash, pipeline_version, sink_status "
+            "FROM file_manifest WHERE path = ?",
+            (path,),
+        ).fetchone()
+
+    @staticmethod
+    def _all_done(sink_status: dict, sinks: Iterable[str]) -> bool:
+        return all(sink_status.get(sink, {}).get("status") in (STATUS_DONE, STATUS_SKIPPED) for sink in sinks)
+
+    def check(self, file_path, sinks: Iterable[str]) -> str:
+        """
+        Classify a file against the manifest.
+
+        :param file_path: Path to the source file.
+        :param sinks: Sink names that must all be done for the file to count as processed.
+        :return: FILE_NEW, FILE_CHANGED or FILE_UNCHANGED.
+        """
+        path = str(file_path)
+        sinks = list(sinks)
+        with self._lock:
+            row = self._get_row(path)
+        if row is None:
+            return FILE_NEW
+
+        size, mtime_ns, content_hash, version, sink_status = row
+        sink_status = json.loads(sink_status)
+        if version != self.pipeline_version or not self._all_done(sink_status, sinks):
+            return FILE_CHANGED
+
+        stat = os.stat(path)
+        if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+            return FILE_UNCHANGED
+
+        # Size or mtime moved (copy, touch, re-download): only the content hash decides.
+        if stat.st_size == size and hash_file(path) == content_hash:
+            with self._lock:
+                self.conn.execute(
+                    "UPDATE file_manifest SET mtime_ns = ? WHERE path = ?",
+                    (stat.st_mtime_ns, path),
+                )
+                self.conn.commit()
+            return FILE_UNCHANGED
+        return FILE_CHANGED
+
+    def begin(self, file_path) -> bool:
+        """
+        Record the current fingerprint of a file that is about to be processed.
+
+        Sink statuses are reset when the content hash or pipeline version differs from
+        the stored one, so a half-processed changed file is never reported as done.
+
+        :param file_path: Path to the source file.
+        :return: True if a previous version of the file was already processed
+                 (i.e. its old outputs must be replaced rather than appended to).
+        """
+        path = str(file_path)
+        stat = os.stat(path)
+        content_hash = hash_file(path)
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            row = self._get_row(path)
+            if row is None:
+                sink_status = {}
+            else:
+                same = row[2] == content_hash and row[3] == self.pipeline_version
+                sink_status = json.loads(row[4]) if same else {}
+            self.conn.execute(
+                "INSERT OR REPLACE INTO file_manifest "
+                "(path, size, mtime_ns, content_hash, pipeline_version, sink_status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, content_hash,
+                 self.pipeline_version, json.dumps(sink_status), now),
+            )
+            self.conn.commit()
+        return row is not None
+
+    def mark(self, file_path, sink: str, status: str, error: Optional[str] = None):
+        """
+        Store the status of one sink for a file previously passed to ``begin``.
+
+        :param file_path: Path to the source file.
+        :param sink: Sink name (e.g. "weaviate", "sqlite").
+        :param status: STATUS_DONE, STATUS_FAILED or STATUS_SKIPPED.
+        :param error: Optional error message for failed sinks.
+        """
+        path = str(file_path)
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            row = self._get_row(path)
+            if row is None:
+                self.logger.warning(f"Manifest has no entry for {path}; call begin() first.")
+                return
+            sink_status = json.loads(row[4])
+            entry = {"status": status, "updated_at": now}
+            if error:
+                entry["error"] = error
+            sink_status[sink] = entry
+            self.conn.execute(
+                "UPDATE file_manifest SET sink_status = ?, updated_at = ? WHERE path = ?",
+                (json.dumps(sink_status, ensure_ascii=False), now, path),
+            )
+            self.conn.commit()
+
+    def mark_all(self, file_path, sinks: Iterable[str], status: str, error: Optional[str] = None):
+        """Store the same status for several sinks of a file."""
+        for sink in sinks:
+            self.mark(file_path, sink, status, error)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,239 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from pathlib import Path
+
+import yaml
+from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
+from docling_core.types.doc.document import DocItemLabel
+
+from src.logger import setup_logger
+
+# Define which labels you DO want (exclude TABLE)
+labels_to_include = {
+    DocItemLabel.PARAGRAPH,
+    DocItemLabel.TEXT,
+    DocItemLabel.HANDWRITTEN_TEXT,
+    DocItemLabel.CAPTION,
+    DocItemLabel.CHART,
+    DocItemLabel.DOCUMENT_INDEX,
+    DocItemLabel.TITLE
+    # DocItemLabel.NUMBERED_LIST,
+    # DocItemLabel.IMAGE,  # optional
+    # don't include DocItemLabel.TABLE
+}
+
+
+class DocumentExport:
+    """
+    One converted document and its serialized representations.
+
+    Every representation is built lazily and at most once, then shared by all sinks
+    that need it (e.g. the markdown goes to both Weaviate and the .md file, the dict
+    to both YAML and JSON).
+    """
+
+    def __init__(self, document, source):
+        """
+        :param document: Converted DoclingDocument.
+        :param source: Source file path.
+        """
+        self.document = document
+        self.source = source
+        self.stem = Path(source).stem
+
+    @cached_property
+    def markdown(self) -> str:
+        return MarkdownDocSerializer(doc=self.document).serialize().text
+
+    @cached_property
+    def markdown_without_tables(self) -> str:
+        return self.document.export_to_markdown(labels=labels_to_include)
+
+    @cached_property
+    def text(self) -> str:
+        return self.document.export_to_text()
+
+    @cached_property
+    def as_dict(self) -> dict:
+        return self.document.export_to_dict()
+
+
+class OutputSink:
+    """
+    Base class of a document output.
+
+    Sinks with ``background = True`` may run on the dispatcher's writer thread,
+    overlapping with the conversion of the next document.
+    """
+
+    name = "sink"
+    background = True
+
+    def write(self, export: DocumentExport):
+        raise NotImplementedError
+
+
+class WeaviateSink(OutputSink):
+    """
+    Stores a document in Weaviate, one object per chunk when a chunker is given,
+    otherwise the whole markdown as a single object.
+    """
+
+    name = "weaviate"
+
+    def __init__(self, weaviate_client, chunker=None):
+        self.weaviate_client = weaviate_client
+        self.chunker = chunker
+
+    def write(self, export):
+        if self.chunker:
+            chunks = self.chunker.chunk(export.document)
+            texts = [chunk.contextualized_text for chunk in chunks]
+            extra_properties = [{"headings": chunk.heading_path} for chunk in chunks]
+        else:
+            texts, extra_properties = [export.markdown], None
+        # Deterministic ids: a re-run overwrites changed chunks instead of appending a copy.
+        report = self.weaviate_client.upsert_source(export.source, texts, extra_properties)
+        if report.has_errors:
+            raise RuntimeError(f"{len(report.failed)} objects failed: {report.failed[0][1]}")
+
+
+class MarkdownSink(OutputSink):
+    name = "markdown"
+
+    def __init__(self, output_dir, without_tables: bool = False):
+        self.output_dir = Path(output_dir)
+        self.without_tables = without_tables
+
+    def write(self, export):
+        md_path = self.output_dir / f"{export.stem}.md"
+        md_text = export.markdown_without_tables if self.without_tables else export.markdown
+        md_path.write_text(md_text, encoding="utf-8")
+        setup_logger("etl_app").info(f"   Markdown saved → {md_path}")
+
+
+class TextSink(OutputSink):
+    name = "text"
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def write(self, export):
+        txt_path = self.output_dir / f"{export.stem}.txt"
+        txt_path.write_text(export.text, encoding="utf-8")
+        setup_logger("etl_app").info(f"   Text saved → {txt_path}")
+
+
+class YamlSink(OutputSink):
+    name = "yaml"
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def write(self, export):
+        yaml_path = self.output_dir / f"{export.stem}.yaml"
+        yaml_path.write_text(yaml.safe_dump(export.as_dict), encoding="utf-8")
+        setup_logger("etl_app").info(f"   YAML saved → {yaml_path}")
+
+
+class JsonSink(OutputSink):
+    name = "json"
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def write(self, export):
+        json_path = self.output_dir / f"{export.stem}.json"
+        json_text = json.dumps(export.as_dict, ensure_ascii=False, indent=2)
+        json_path.write_text(json_text, encoding="utf-8")
+        setup_logger("etl_app").info(f"   JSON saved → {json_path}")
+
+
+class TableSink(OutputSink):
+    """
+    Table extraction into SQLite/CSV. Runs inline because the sqlite3 connection of
+    StructuredToSQL belongs to the calling thread.
+    """
+
+    name = "tables"
+    background = False
+
+    def __init__(self, doc_converter, output_dir):
+        self.doc_converter = doc_converter
+        self.output_dir = Path(output_dir)
+
+    def write(self, export):
+        self.doc_converter.table_extraction(export.document, export.stem, self.output_dir)
+
+
+class SinkDispatcher:
+    """
+    Fans each DocumentExport out to all enabled sinks.
+
+    Inline sinks run in ``submit``; background sinks run on a single writer thread,
+    so the next document can be converted while the previous one is being written.
+    At most ``max_pending`` documents wait for the writer, which bounds memory.
+    """
+
+    def __init__(self, sinks, max_pending: int = 4):
+        """
+        :param sinks: List of OutputSink instances, written in order.
+        :param max_pending: Maximum number of documents queued for the writer thread.
+        """
+        self.logger = setup_logger("etl_app")
+        self.sinks = list(sinks)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sink-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    def _write(self, export, sinks, errors):
+        for sink in sinks:
+            try:
+                sink.write(export)
+            except Exception as e:
+                self.logger.error(f"❌ {sink.name} output failed for {export.source}: {e}")
+                errors[sink.name] = str(e)
+
+    def submit(self, export: DocumentExport, callback=None):
+        """
+        Write a document to every sink.
+
+        :param export: The document to write.
+        :param callback: Optional ``callback(export, errors)`` called once all sinks are
+                         done; ``errors`` maps failed sink names to their error message.
+        """
+        errors = {}
+        self._write(export, [s for s in self.sinks if not s.background], errors)
+        background = [s for s in self.sinks if s.background]
+
+        def run():
+            try:
+                self._write(export, background, errors)
+                if callback:
+                    callback(export, errors)
+            except Exception as e:
+                self.logger.error(f"❌ Sink callback failed for {export.source}: {e}")
+            finally:
+                self._slots.release()
+
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(run))
+        self._futures = [f for f in self._futures if not f.done()]
+
+    def drain(self):
+        """Block until every submitted document has been written."""
+        for future in list(self._futures):
+            future.result()
+        self._futures = []
+
+    def close(self):
+        self.drain()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,151 @@
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pypdfium2 as pdfium
+
+# Keywords locating the OrganizationExtractedFields content in Japanese credit reports
+# and company brochures. Matched against NFKC-normalized, lower-cased page text.
+FIELD_KEYWORDS: Dict[str, tuple] = {
+    "company_overview": ("会社概要", "企業概要", "商号", "設立", "資本金", "本社所在地", "所在地", "company overview", "corporate profile"),
+    "business_activities": ("事業内容", "営業種目", "事業概要", "主要製品", "取扱品目", "business activities"),
+    "history": ("沿革", "会社沿革", "創業", "history"),
+    "group_companies": ("関係会社", "子会社", "グループ会社", "関連会社", "subsidiaries"),
+    "major_business_partners": ("主要取引先", "取引先", "仕入先", "販売先", "取引銀行", "business partners"),
+    "sales_trends": ("業績", "売上高", "売上推移", "決算", "損益", "財務", "sales"),
+    "president_message": ("代表挨拶", "社長挨拶", "トップメッセージ", "ごあいさつ", "message from"),
+    "representative_persons": ("代表者", "代表取締役", "役員", "経歴", "略歴", "representative", "ceo"),
+}
+# Fields almost every report has; the selection is trusted only if most of them are found.
+CORE_FIELDS = ("company_overview", "business_activities", "history", "representative_persons")
+
+# A line this short containing a keyword is treated as a section heading.
+_HEADING_MAX_CHARS = 24
+_SPACES = re.compile(r"[ \t　]+")
+
+
+@dataclass
+class PageScore:
+    index: int
+    chars: int
+    score: float = 0.0
+    heading_fields: List[str] = field(default_factory=list)
+    # Field -> relative position (0 = top, 1 = bottom) of its first heading on the page.
+    heading_positions: Dict[str, float] = field(default_factory=dict)
+    body_fields: List[str] = field(default_factory=list)
+
+
+def _page_text(page) -> str:
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_range()
+    finally:
+        textpage.close()
+
+
+def score_page(index: int, text: str) -> PageScore:
+    """
+    Score one page by keyword matches: 3 points per field with a heading match
+    and 1 per field found only in body text.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    lines = [_SPACES.sub("", line) for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    result = PageScore(index=index, chars=sum(len(line) for line in lines))
+    for field_name, keywords in FIELD_KEYWORDS.items():
+        position = next(
+            (i / max(len(lines) - 1, 1) for i, line in enumerate(lines)
+             if len(line) <= _HEADING_MAX_CHARS and any(k.replace(" ", "") in line for k in keywords)),
+            None,
+        )
+        if position is not None:
+            result.heading_fields.append(field_name)
+            result.heading_positions[field_name] = position
+            result.score += 3
+        elif any(k.replace(" ", "") in text.replace(" ", "") for k in keywords):
+            result.body_fields.append(field_name)
+            result.score += 1
+    return result
+
+
+def score_pages(pdf_path) -> List[PageScore]:
+    """Score every page of a PDF from its text layer."""
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        scores = []
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                scores.append(score_page(index, _page_text(page)))
+            finally:
+                page.close()
+        return scores
+    finally:
+        pdf.close()
+
+
+def select_pages(pdf_path,
+                 min_page_count: int = 5,
+                 min_core_coverage: float = 0.75,
+                 min_chars_per_page: int = 50,
+                 max_selected_ratio: float = 0.6) -> Optional[List[int]]:
+    """
+    Pages of a PDF likely to hold the extraction fields, or None when the whole
+    document should be sent.
+
+    The first page (cover with the company name), every page with a field
+    heading, the best page of each field found only in body text and the page
+    after a heading in the lower third of its page (section running over) are
+    kept. The full document is used instead when it is short, has no usable text
+    layer (scanned), misses too many CORE_FIELDS or the selection would not save much.
+
+    :param min_page_count: Documents with fewer pages are always sent whole.
+    :param min_core_coverage: Share of CORE_FIELDS that must be located.
+    :param min_chars_per_page: Average text-layer characters below which the PDF is treated as scanned.
+    :param max_selected_ratio: Selections above this share of the pages fall back to the full document.
+    :return: Sorted 0-based page indices, or None.
+    """
+    if Path(pdf_path).suffix.lower() != ".pdf":
+        return None
+    scores = score_pages(pdf_path)
+    page_count = len(scores)
+    if page_count < min_page_count:
+        return None
+    if sum(s.chars for s in scores) / page_count < min_chars_per_page:
+        return None
+
+    selected = {0}
+    located = set()
+    for s in scores:
+        if s.heading_fields:
+            selected.add(s.index)
+            located.update(s.heading_fields)
+            if s.index + 1 < page_count and any(p >= 2 / 3 for p in s.heading_positions.values()):
+                selected.add(s.index + 1)
+    for field_name in FIELD_KEYWORDS:
+        if field_name in located:
+            continue
+        candidates = [s for s in scores if field_name in s.body_fields]
+        if candidates:
+            selected.add(max(candidates, key=lambda s: s.score).index)
+            located.add(field_name)
+
+    coverage = sum(f in located for f in CORE_FIELDS) / len(CORE_FIELDS)
+    if coverage < min_core_coverage or len(selected) > max_selected_ratio * page_count:
+        return None
+    return sorted(selected)
+
+
+def write_pages(pdf_path, page_indices: List[int], output_path) -> Path:
+    """Write the given pages of a PDF, in order, to a new PDF."""
+    source = pdfium.PdfDocument(str(pdf_path))
+    subset = pdfium.PdfDocument.new()
+    try:
+        subset.import_pages(source, list(page_indices))
+        subset.save(str(output_path))
+    finally:
+        subset.close()
+        source.close()
+    return Path(output_path)
@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from docling_core.types.doc.base import BoundingBox, CoordOrigin, Size
+from docling_core.types.doc.document import DoclingDocument, DocumentOrigin, ProvenanceItem
+from docling_core.types.doc.labels import DocItemLabel
+
+from src.hash_utils import hash_file
+
+# Bump when the triage thresholds or the text-layer document builder change, so
+# cached text-route documents are rebuilt.
+TRIAGE_VERSION = "1"
+
+ROUTE_TEXT = "text"
+ROUTE_FULL = "full"
+
+
+@dataclass
+class PdfProfile:
+    page_count: int
+    sampled_pages: int
+    # Per sampled page: text-layer characters, share of the page covered by images,
+    # and number of vector path objects (ruling lines of drawn tables).
+    chars: List[int]
+    image_coverage: List[float]
+    path_objects: List[int]
+
+
+def _sample_indices(page_count: int, max_pages: int) -> List[int]:
+    if page_count <= max_pages:
+        return list(range(page_count))
+    step = page_count / max_pages
+    return sorted({int(i * step) for i in range(max_pages)})
+
+
+def profile_pdf(pdf_path, max_pages: int = 40) -> PdfProfile:
+    """
+    Inspect a PDF's text layer and page objects without rendering it.
+
+    :param max_pages: Pages inspected, spread evenly over longer documents.
+    """
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        page_count = len(pdf)
+        indices = _sample_indices(page_count, max_pages)
+        chars, image_coverage, path_objects = [], [], []
+        for index in indices:
+            page = pdf[index]
+            try:
+                width, height = page.get_size()
+                textpage = page.get_textpage()
+                try:
+                    chars.append(len(textpage.get_text_range().strip()))
+                finally:
+                    textpage.close()
+                image_area, paths = 0.0, 0
+                for obj in page.get_objects():
+                    if obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+                        left, bottom, right, top = obj.get_pos()
+                        image_area += max(0.0, right - left) * max(0.0, top - bottom)
+                    elif obj.type == pdfium_c.FPDF_PAGEOBJ_PATH:
+                        paths += 1
+                image_coverage.append(min(1.0, image_area / (width * height)) if width and height else 0.0)
+                path_objects.append(paths)
+            finally:
+                page.close()
+        return PdfProfile(page_count, len(indices), chars, image_coverage, path_objects)
+    finally:
+        pdf.close()
+
+
+def choose_route(profile: PdfProfile,
+                 min_chars_per_page: int = 100,
+                 max_image_coverage: float = 0.25,
+                 max_path_objects: int = 30) -> Tuple[str, str]:
+    """
+    Pick the conversion route of a PDF.
+
+    A document is born-digital text (ROUTE_TEXT) when no inspected page is an
+    image without a text layer (scan), no page is dominated by images and no page
+    draws enough lines to hold a ruled table; anything else needs the layout/table
+    models (ROUTE_FULL). Sparse pages without images (covers, blank pages) are fine.
+
+    :return: (route, reason)
+    """
+    if not profile.page_count or sum(profile.chars) < min_chars_per_page:
+        return ROUTE_FULL, "no text layer"
+    scanned = sum(c < min_chars_per_page and cov > 0.05 for c, cov in zip(profile.chars, profile.image_coverage))
+    if scanned:
+        return ROUTE_FULL, f"{scanned} image pages without text layer"
+    if max(profile.image_coverage) > max_image_coverage:
+        return ROUTE_FULL, f"images cover {max(profile.image_coverage):.0%} of a page"
+    if max(profile.path_objects) > max_path_objects:
+        return ROUTE_FULL, f"{max(profile.path_objects)} vector paths on a page (tables/figures)"
+    return ROUTE_TEXT, (
+        f"text layer on {profile.sampled_pages}/{profile.page_count} inspected pages, "
+        f"images ≤ {max(profile.image_coverage):.0%}"
+    )
+
+
+def _is_wide(char: str) -> bool:
+    # CJK text is written without spaces between wrapped lines.
+    return ord(char) >= 0x3000
+
+
+def _join_lines(lines: List[str]) -> str:
+    text = lines[0]
+    for line in lines[1:]:
+        if text and line and not (_is_wide(text[-1]) and _is_wide(line[0])):
+            text += " "
+        text += line
+    return text
+
+
+def _page_paragraphs(page) -> List[Tuple[str, Tuple[float, float, float, float]]]:
+    """
+    Paragraphs of a page from its text segments: lines closer than about one line
+    height are joined. Boxes are (left, top, right, bottom) in PDF coordinates.
+    """
+    textpage = page.get_textpage()
+    try:
+        paragraphs = []
+        lines, box, prev_bottom = [], None, None
+        for index in range(textpage.count_rects()):
+            left, bottom, right, top = textpage.get_rect(index)
+            text = textpage.get_text_bounded(left, bottom, right, top).strip()
+            if not text:
+                continue
+            line_height = max(top - bottom, 1.0)
+            if lines and prev_bottom is not None and (prev_bottom - top) > 0.8 * line_height:
+                paragraphs.append((_join_lines(lines), box))
+                lines, box = [], None
+            lines.append(text)
+            box = (left, top, right, bottom) if box is None else (
+                min(box[0], left), max(box[1], top), max(box[2], right), min(box[3], bottom)
+            )
+            prev_bottom = bottom
+        if lines:
+            paragraphs.append((_join_lines(lines), box))
+        return paragraphs
+    finally:
+        textpage.close()
+
+
+def text_layer_document(pdf_path) -> DoclingDocument:
+    """
+    Build a DoclingDocument from a PDF's text layer alone: one text item per
+    paragraph with its page and bounding box, no layout, table or picture models.
+    """
+    pdf_path = Path(pdf_path)
+    document = DoclingDocument(
+        name=pdf_path.stem,
+        origin=DocumentOrigin(
+            mimetype="application/pdf",
+            binary_hash=int(hash_file(pdf_path)[:16], 16),
+            filename=pdf_path.name,
+        ),
+    )
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                width, height = page.get_size()
+                document.add_page(page_no=index + 1, size=Size(width=width, height=height))
+                for text, (left, top, right, bottom) in _page_paragraphs(page):
+                    document.add_text(
+                        label=DocItemLabel.TEXT,
+                        text=text,
+                        prov=ProvenanceItem(
+                            page_no=index + 1,
+                            bbox=BoundingBox(l=left, t=top, r=right, b=bottom, coord_origin=CoordOrigin.BOTTOMLEFT),
+                            charspan=(0, len(text)),
+                        ),
+                    )
+            finally:
+                page.close()
+    finally:
+        pdf.close()
+    return document
@@ -2,16 +2,27 @@ from pathlib import Path
 from src.logger import setup_logger
 from src.db_conversion.struct_to_sql import StructuredToSQL
 from src.file_loader import FileLoader
-from config import SOURCE_PATH, SUPPORT_FORMAT, OUTPUT_PATH
+from config import SOURCE_PATH, SUPPORT_FORMAT, OUTPUT_PATH, PIPELINE_VERSION, MANIFEST_PATH, NUM_WORKERS, DOC_CACHE_DIR, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, STAGING_DIR, EXTRACTION_CACHE_PATH, PDF_ROUTING, \
+    SHARD_PAGES, SHARD_MIN_PAGES
 from src.docling_extractor import DoclingConverter
+from src.conversion_pool import ConversionPool
+from src.output_sinks import DocumentExport, SinkDispatcher
+from src.chunking import StructureChunker
 from src.weaviate_utils import WeaviateClient
 from src.agentic_extractor import AgenticExtractor
 from src.db_conversion.pg_db_utils import DatabaseManager
+from src.db_conversion.pg_async_writer import AsyncPostgresWriter, close_shared_pools
+from src.manifest import FileManifest, FILE_UNCHANGED, STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED
+from src.hash_utils import hash_json
+from src.pdf_triage import TRIAGE_VERSION
+import asyncio
 import os
 from pathlib import Path
 class ETLPipeline:
     def __init__(self, db_path: str = "business_data.db",
-                 use_dask: bool = False,agentic_parse: bool = False, weaviate_collection_name:str="Business_data_collection",threshold_mb: int = 100):
+                 use_dask: bool = False,agentic_parse: bool = False, weaviate_collection_name:str="Business_data_collection",threshold_mb: int = 100,
+                 incremental: bool = True, num_workers: int = NUM_WORKERS,
+                 batch_size: int = 16, batch_max_mb: int = 200):
         """
         Initialize the ETL Pipeline.
         :param source_path: Path where source files are located.
@@ -21,6 +32,10 @@ class ETLPipeline:
         :param agentic_parse: Whether to use Agentic Doc for parsing PDF files.
         :param weaviate_collection_name: Name of the Weaviate collection to use.
         :param threshold_mb: File size threshold (MB) for using Dask.
+        :param incremental: Skip files the manifest records as already processed and unchanged.
+        :param num_workers: Number of docling worker processes; 1 converts in this process.
+        :param batch_size: Maximum number of documents per docling convert_all batch.
+        :param batch_max_mb: Maximum total file size (MB) of one conversion batch.
 
 
         """
@@ -31,12 +46,180 @@ class ETLPipeline:
         self.threshold_mb = threshold_mb
         self.agentic_parse = agentic_parse
         self.file_loader = FileLoader(directory_path=SOURCE_PATH, allowed_extensions=SUPPORT_FORMAT)
-        self.struct_converter = StructuredToSQL(db_path=self.db_path, use_dask=self.use_dask, threshold_mb=self.threshold_mb)
+        self.struct_converter = StructuredToSQL(db_path=self.db_path, use_dask=self.use_dask, threshold_mb=self.threshold_mb,
+                                               staging_dir=STAGING_DIR)
         self.client = WeaviateClient(collection_name=weaviate_collection_name)
-        self.doc_converter = DoclingConverter(self.client,self.struct_converter)
-        self.agentic_extractor=AgenticExtractor()#include_marginalia=True,include_metadata_in_markdown=False, result_save_dir=OUTPUT_PATH)
+        self.chunker = StructureChunker(max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS)
+        self.doc_converter = DoclingConverter(self.client,self.struct_converter, cache_dir=DOC_CACHE_DIR,
+                                              chunker=self.chunker, route_pdfs=PDF_ROUTING)
+        self.agentic_extractor=AgenticExtractor(cache_path=EXTRACTION_CACHE_PATH)#include_marginalia=True,include_metadata_in_markdown=False, result_save_dir=OUTPUT_PATH)
         self.pg_db_manager = DatabaseManager()
-        
+        self.doc_export_options = dict(
+            table_extraction=False,
+            save_VectorDB=True,  # Enable saving to Weaviate
+            save_markdown=True,
+            save_yaml=False,
+            save_text=False,
+            save_json=False,
+        )
+        self.incremental = incremental
+        self.num_workers = max(1, num_workers)
+        self.batch_size = batch_size
+        self.batch_max_mb = batch_max_mb
+        # Any change to what the pipeline produces invalidates the manifest entries.
+        config_version = hash_json({
+            "pipeline_version": PIPELINE_VERSION,
+            "agentic_parse": self.agentic_parse,
+            "weaviate_collection_name": weaviate_collection_name,
+            "doc_export_options": self.doc_export_options,
+            "chunking": [CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS],
+            # Text-layer route vs layout models: switching it changes every PDF output.
+            "pdf_routing": [PDF_ROUTING, TRIAGE_VERSION if PDF_ROUTING else None],
+            "sharding": [SHARD_PAGES, SHARD_MIN_PAGES] if self.num_workers > 1 and SHARD_PAGES else None,
+        })[:16]
+        self.manifest = FileManifest(MANIFEST_PATH, pipeline_version=config_version)
+
+    def _sinks_for(self, ext: str) -> list:
+        """
+        Return the manifest sink names a file with this extension is written to.
+        """
+        if ext in [".csv", ".xlsx", ".xlsm"]:
+            return ["sqlite"]
+        if self.agentic_parse and ext == ".pdf":
+            return ["postgres"]
+        sinks = []
+        if self.doc_export_options["save_VectorDB"]:
+            sinks.append("weaviate")
+        for name in ("markdown", "yaml", "text", "json"):
+            if self.doc_export_options[f"save_{name}"]:
+                sinks.append(name)
+        if self.doc_export_options["table_extraction"]:
+            sinks.append("tables")
+        return sinks
+
+    def _extract_agentic_files(self, agentic_files, failed_files):
+        """
+        Extract organizations/persons from PDFs with Agentic Doc, many at a time under
+        an adaptive rate limit, and upsert each result into Postgres as it arrives.
+        """
+        if not agentic_files:
+            return
+        sinks = self._sinks_for(".pdf")
+        try:
+            self.pg_db_manager.create_tables()
+            extracted = asyncio.run(self._extract_and_store(agentic_files, failed_files, sinks))
+        except Exception as e:
+            self.logger.error(f"Agentic Doc extraction into Postgres failed: {e}")
+            for file_path in agentic_files:
+                if str(file_path) not in failed_files:
+                    failed_files.append(str(file_path))
+                self.manifest.mark_all(file_path, sinks, STATUS_FAILED, error=str(e))
+            return
+        self.logger.info(f"Inserted {extracted} of {len(agentic_files)} Agentic Doc results into Postgres database.")
+
+    async def _extract_and_store(self, agentic_files, failed_files, sinks) -> int:
+        written = []
+        async with AsyncPostgresWriter(dsn=self.pg_db_manager.pg_db_url) as writer:
+            async for file_path, extraction, error in self.agentic_extractor.extract_many(agentic_files):
+                if error is None and extraction is None:
+                    error = "no extraction returned"
+                if error:
+                    self.logger.error(f"Failed to process {file_path}: {error}")
+                    failed_files.append(str(file_path))
+                    self.manifest.mark_all(file_path, sinks, STATUS_FAILED, error=error)
+                    continue
+                self.logger.info(f"Extracted {file_path} with Agentic Doc")
+                await writer.submit(extraction, source=str(file_path))
+                written.append(str(file_path))
+        await close_shared_pools()
+        for file_path in written:
+            error = writer.failed_sources.get(file_path)
+            if error:
+                failed_files.append(file_path)
+                self.manifest.mark_all(file_path, sinks, STATUS_FAILED, error=error)
+            else:
+                self.manifest.mark_all(file_path, sinks, STATUS_DONE)
+        return len(written) - len(writer.failed_sources)
+
+    def _load_structured_files(self, struct_files, failed_files):
+        """
+        Load CSV/XLSX files into SQLite. With num_workers > 1 the files are parsed by
+        a pool of processes while a single writer loads them (StructuredToSQL.load_files).
+        """
+        if not struct_files:
+            return
+
+        def on_loaded(file_path, error):
+            sinks = self._sinks_for(Path(file_path).suffix.lower())
+            if error:
+                failed_files.append(str(file_path))
+                self.manifest.mark_all(file_path, sinks, STATUS_FAILED, error=error)
+            else:
+                self.manifest.mark_all(file_path, sinks, STATUS_DONE)
+
+        self.logger.info(f"Loading {len(struct_files)} structured files")
+        if self.num_workers > 1:
+            self.struct_converter.load_files(struct_files, workers=self.num_workers, on_loaded=on_loaded)
+            return
+        for file_path in struct_files:
+            self.logger.info(f"Processing structured file: {file_path}")
+            error = self.struct_converter.process_individual_file(file_path=file_path)
+            on_loaded(file_path, error)
+
+    def _convert_document_files(self, doc_files, failed_files):
+        """
+        Convert document files with docling and export them to the enabled sinks.
+
+        Files are grouped into per-format batches, each converted by one convert_all
+        call. With num_workers > 1 the batches run in a ConversionPool; the exports
+        (Weaviate, markdown, SQL tables) always run here in the parent process, through
+        a SinkDispatcher that overlaps them with the next conversion.
+        """
+        if not doc_files:
+            return
+        batches = self.file_loader.batch_by_format(doc_files, max_files=self.batch_size, max_mb=self.batch_max_mb)
+        self.logger.info(f"Converting {len(doc_files)} documents in {len(batches)} batches")
+        pool = None
+        if self.num_workers > 1:
+            pool = ConversionPool(num_workers=self.num_workers, cache_dir=DOC_CACHE_DIR, route_pdfs=PDF_ROUTING,
+                                  converter=self.doc_converter, shard_pages=SHARD_PAGES,
+                                  shard_min_pages=SHARD_MIN_PAGES)
+            results = pool.convert(batches)
+        else:
+            results = (
+                result
+                for batch in batches
+                for result in self.doc_converter.iter_documents(batch)
+            )
+        sinks = self.doc_converter.build_sinks(output_dir=OUTPUT_PATH, **self.doc_export_options)
+
+        def on_written(export, errors):
+            manifest_sinks = self._sinks_for(Path(export.source).suffix.lower())
+            if errors:
+                failed_files.append(str(export.source))
+                for sink in manifest_sinks:
+                    if sink in errors:
+                        self.manifest.mark(export.source, sink, STATUS_FAILED, error=errors[sink])
+                    else:
+                        self.manifest.mark(export.source, sink, STATUS_DONE)
+            else:
+                self.manifest.mark_all(export.source, manifest_sinks, STATUS_DONE)
+
+        try:
+            with SinkDispatcher(sinks) as dispatcher:
+                for source, document, error in results:
+                    if error:
+                        self.logger.error(f"Failed to process {source}: {error}")
+                        failed_files.append(str(source))
+                        self.manifest.mark_all(source, self._sinks_for(Path(source).suffix.lower()),
+                                               STATUS_FAILED, error=error)
+                        continue
+                    self.logger.info(f"✅ Document converted: {Path(source).name}")
+                    export = DocumentExport(document, source)
+                    dispatcher.submit(export, callback=on_written)
+        finally:
+            if pool:
+                pool.close()
 
     def run(self):
         """
@@ -52,51 +235,60 @@ class ETLPipeline:
 
         self.logger.info("Starting file conversion process...")
 
+        skipped = 0
+        struct_files = []
+        doc_files = []
+        agentic_files = []
         for file_path in files:
             ext = Path(file_path).suffix.lower()
+            sinks = self._sinks_for(ext)
             try:
+                state = self.manifest.check(file_path, sinks)
+                if self.incremental and state == FILE_UNCHANGED:
+                    skipped += 1
+                    self.logger.debug(f"Unchanged since last run, skipping: {file_path}")
+                    continue
+                self.manifest.begin(file_path)
+
                 if ext in [".csv", ".xlsx", ".xlsm"]:
-                    self.logger.info(f"Processing structured file: {file_path}")
-                    self.struct_converter.process_individual_file(file_path=file_path)
+                    # Loaded after the scan so parsing can overlap with the SQLite writes.
+                    struct_files.append(file_path)
+                    continue
 
                 elif ext in [".pdf", ".docx", ".pptx", ".txt", ".md", ".html", ".asciidoc",".pptx"]:
                     self.logger.info(f"Processing document file: {file_path}")
                     if self.agentic_parse==True and ext == ".pdf":
-                        # Use Agentic Doc to parse the PDF
-                        result = self.agentic_extractor.parse_documents(file_path)
-                        ser_result = result[0].extraction
-                        print(ser_result)
-                        self.pg_db_manager.create_tables()
-                        # Insert the structured data into the Postgres database
-                        self.pg_db_manager.insert_organization_with_person(ser_result)
-                        self.logger.info(f"Processed {file_path} with Agentic Doc and inserted into Postgres database.")
-                        ### need to implement the logic to convert the extracted data into a format suitable for postgres database
-                        
-                        
+                        # Extracted with Agentic Doc after the scan, many documents concurrently.
+                        agentic_files.append(file_path)
+                        continue
                     else:
-                        self.doc_converter.convert_documents(
-                            input_paths=[file_path],  # Replace with your file paths
-                            output_dir=OUTPUT_PATH,
-                            table_extraction=False,
-                            save_VectorDB=True,  # Enable saving to Weaviate
-                            save_markdown=True,
-                            save_yaml=False,
-                            save_text=False,
-                            save_json=False
-                        )
+                        # Converted after the scan so the files can be spread over the workers.
+                        doc_files.append(file_path)
+                        continue
 
                 elif ext in [".png", ".jpg", ".jpeg", ".bmp"]:
                     self.logger.info(f"Processing image file: {file_path}")
-                    
+                    # Nothing is written for images yet; record them so they count as unchanged.
+                    self.manifest.mark_all(file_path, sinks, STATUS_SKIPPED)
+                    continue
 
                 else:
                     self.logger.warning(f"Unsupported format: {file_path}")
+                    self.manifest.mark_all(file_path, sinks, STATUS_SKIPPED)
+                    continue
 
             except Exception as e:
                 self.logger.error(f"Failed to process {file_path}: {e}")
                 failed_files.append(str(file_path))
+                self.manifest.mark_all(file_path, sinks, STATUS_FAILED, error=str(e))
+
+        self._extract_agentic_files(agentic_files, failed_files)
+        self._load_structured_files(struct_files, failed_files)
+        self._convert_document_files(doc_files, failed_files)
 
         self.struct_converter.close()
+        self.manifest.close()
+        self.logger.info(f"Skipped {skipped} unchanged files.")
         self.logger.info("ETL pipeline completed.")
         # Write failed files to file
         if failed_files:
@@ -1,29 +1,23 @@
-import weaviate
-import os
-from weaviate.classes.query import MetadataQuery
-from weaviate.classes.query import Rerank
-from dotenv import load_dotenv
-load_dotenv(override=True  )
-headers = {
-    "X-JinaAI-Api-Key": os.getenv("JINAAI_API_KEY")
-}
-client = weaviate.connect_to_local(headers=headers)
+import asyncio
+from src.async_query import AsyncWeaviateQueryClient, benchmark
 
-print("Collection list: ",client.collections.list_all())
 
-collection = client.collections.get("Business_data_collection")
+async def main():
+    # One shared connection for every query; nothing connects at import time.
+    async with AsyncWeaviateQueryClient(collection_name="Business_data_collection") as client:
+        results = await client.query("MechanicsPOM cove", limit=5)
+        for o in results:
+            print(o.properties)
+            print(o.distance)
+            print(o.rerank_score)
 
+        queries = ["MechanicsPOM cove", "光学部品", "レーザー", "ハナムラオプティクス", "株式会社ispace"]
+        batch = await client.batch_query(queries, limit=5, mode="hybrid")
+        for query_text, hits in zip(queries, batch):
+            print(f"{query_text}: {len(hits)} hits")
 
-response = collection.query.near_text(
-    query="MechanicsPOM cove",
-    limit=5,
-    rerank=Rerank(
-        prop="text",
-    ),
-    return_metadata=MetadataQuery(distance=True),
-    return_properties=["text","source"],
-)
-for o in response.objects:
-    print(o.properties)
-    print(o.metadata.distance)
-    print(o.metadata.rerank_score)
\ No newline at end of file
+        print("Benchmark:", await benchmark(client, queries * 4, rounds=3, limit=5))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
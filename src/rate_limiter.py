@@ -0,0 +1,94 @@
+import asyncio
+import re
+import time
+from typing import Optional, Tuple
+
+# agentic_doc reports requests that stayed throttled past its own retries as RetryableError.
+_THROTTLE_MESSAGE = re.compile(
+    r"\b(?:429|503)\b|too many requests|service unavailable|rate.?limit|throttl|RetryableError", re.IGNORECASE
+)
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def throttle_info(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Whether an exception is a throttling response (HTTP 429/503 or a rate-limit
+    message), and the server's Retry-After in seconds when it sent one.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    throttled = status in THROTTLE_STATUS_CODES or bool(_THROTTLE_MESSAGE.search(str(error)))
+    retry_after = None
+    headers = getattr(response, "headers", None)
+    if throttled and headers:
+        try:
+            retry_after = float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            retry_after = None
+    return throttled, retry_after
+
+
+class AdaptiveTokenBucket:
+    """
+    asyncio token bucket whose rate adapts to the server (AIMD).
+
+    Each request takes a token; tokens refill at ``rate`` per second up to
+    ``burst``. Every success raises the rate by ``increase`` (additive increase,
+    up to ``max_rate``); a throttling response multiplies it by ``decrease``
+    (multiplicative decrease, down to ``min_rate``), empties the bucket and
+    honours Retry-After, so the client settles just under the server's limit.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: float = 4, min_rate: float = 0.1, max_rate: float = 20.0,
+                 increase: float = 0.2, decrease: float = 0.5):
+        """
+        :param rate: Initial requests per second.
+        :param burst: Bucket size, the number of requests allowed back to back.
+        :param min_rate: Lower bound of the rate.
+        :param max_rate: Upper bound of the rate.
+        :param increase: Requests per second added after each success.
+        :param decrease: Factor applied to the rate after a throttling response.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = None
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        now = time.monotonic()
+        self._refill(now)
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
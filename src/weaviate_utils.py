@@ -1,8 +1,78 @@
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
 from weaviate.classes.query import MetadataQuery, Rerank, Filter
+from weaviate.classes.data import DataObject
+from weaviate.util import generate_uuid5
+from src.hash_utils import hash_json
+from src.query_cache import TTLCache
+from src.embedding_cache import (
+    CachedEmbedder,
+    EmbeddingCache,
+    PASSAGE_TASK,
+    QUERY_TASK,
+    jina_embed_fn,
+    openai_embed_fn,
+)
+
+DEFAULT_MODELS = {"jina": "jina-embeddings-v3", "openai": "text-embedding-3-small"}
+
+
+@dataclass
+class IngestReport:
+    """Outcome of a streaming insert: counts, per-object failures and throughput."""
+    inserted: int = 0
+    failed: List[Tuple[object, str]] = field(default_factory=list)
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.failed)
+
+    @property
+    def objects_per_second(self) -> float:
+        return self.inserted / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def _iter_batches(objects: Iterable, batch_size: int, max_batch_bytes: Optional[int] = None):
+    """
+    Split an iterable of objects into lists of at most ``batch_size`` objects.
+    With ``max_batch_bytes`` a batch is also closed once its text payload reaches
+    that size, so a few huge documents do not hit the request-size limit.
+    """
+    iterator = iter(objects)
+    if not max_batch_bytes:
+        while batch := list(islice(iterator, batch_size)):
+            yield batch
+        return
+    batch, batch_bytes = [], 0
+    for obj in iterator:
+        properties = getattr(obj, "properties", obj) or {}
+        size = sum(len(v.encode("utf-8")) for v in properties.values() if isinstance(v, str))
+        if batch and (len(batch) >= batch_size or batch_bytes + size > max_batch_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(obj)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def provider_headers(embedding_provider: str) -> dict:
+    """Request headers carrying the API key of the embedding/rerank provider."""
+    headers = {}
+    if embedding_provider == "jina":
+        headers["X-JinaAI-Api-Key"] = os.getenv("JINAAI_API_KEY")
+    elif embedding_provider == "openai":
+        headers["X-OpenAI-Api-Key"] = os.getenv("OPENAI_API_KEY")
+    return headers
 
 
 class WeaviateClient:
@@ -11,26 +81,105 @@ class WeaviateClient:
         collection_name="DemoCollection",
         properties=None,
         embedding_provider="jina",          # "jina" or "openai"
-        embedding_model=None                # optional model name
+        embedding_model=None,               # optional model name
+        embedding_cache_path=None,          # optional local vector cache (bring-your-own-vectors)
+        embed_fn=None,                      # optional embed_fn(texts, task) replacing the provider API
+        query_cache_size=1024,              # entries of the query vector / result caches
+        query_cache_ttl=600                 # seconds before a cached query result expires
     ):
         load_dotenv(override=True)
         self.collection_name = collection_name
         self.embedding_provider = embedding_provider.lower()
         self.embedding_model = embedding_model
+        self.embedder = self._build_embedder(
+            embedding_cache_path or os.getenv("EMBEDDING_CACHE_PATH"), embed_fn
+        )
+        self.query_vector_cache = TTLCache(maxsize=query_cache_size, ttl_seconds=query_cache_ttl)
+        self.result_cache = TTLCache(maxsize=query_cache_size, ttl_seconds=query_cache_ttl)
         self.properties_config = properties or [
             {"name": "text", "data_type": DataType.TEXT, "vectorize_property": True},
-            {"name": "source", "data_type": DataType.TEXT, "vectorize_property": False}
+            {"name": "source", "data_type": DataType.TEXT, "vectorize_property": False},
+            {"name": "chunk_index", "data_type": DataType.INT, "vectorize_property": False},
+            {"name": "headings", "data_type": DataType.TEXT, "vectorize_property": False},
+            {"name": "content_hash", "data_type": DataType.TEXT, "vectorize_property": False}
         ]
         self.client = self._connect()
         self.collection = self._create_collection()
+        if self.embedder is not None and not self._server_input_matches():
+            print(
+                f"⚠️ Collection '{self.collection_name}' vectorizes its name with the text, so client-side "
+                f"vectors would not match the server's. Client-side embedding is disabled; recreate the "
+                f"collection and re-ingest to use the embedding cache."
+            )
+            self.embedder = None
 
     def _connect(self):
-        headers = {}
-        if self.embedding_provider == "jina":
-            headers["X-JinaAI-Api-Key"] = os.getenv("JINAAI_API_KEY")
-        elif self.embedding_provider == "openai":
-            headers["X-OpenAI-Api-Key"] = os.getenv("OPENAI_API_KEY")
-        return weaviate.connect_to_local(headers=headers)
+        return weaviate.connect_to_local(headers=provider_headers(self.embedding_provider))
+
+    def _model_name(self):
+        return self.embedding_model or DEFAULT_MODELS.get(self.embedding_provider)
+
+    def _build_embedder(self, cache_path, embed_fn):
+        """
+        Build the client-side embedder used to send precomputed vectors.
+
+        Without a cache path or an embed_fn, Weaviate keeps vectorizing on its own.
+        """
+        if not cache_path and embed_fn is None:
+            return None
+        if embed_fn is None:
+            if self.embedding_provider == "jina":
+                embed_fn = jina_embed_fn(self._model_name(), os.getenv("JINAAI_API_KEY"))
+            elif self.embedding_provider == "openai":
+                embed_fn = openai_embed_fn(self._model_name(), os.getenv("OPENAI_API_KEY"))
+            else:
+                raise ValueError(f"Unsupported embedding provider: {self.embedding_provider}")
+        cache = EmbeddingCache(cache_path) if cache_path else None
+        return CachedEmbedder(embed_fn, self.embedding_provider, self._model_name(), cache)
+
+    def _vectorize_text(self, properties: dict) -> str:
+        """
+        Text of the vectorized properties, as Weaviate's text2vec-jinaai/openai
+        modules build it for a collection created by ``_vector_config``: the values
+        of the source properties in name order, joined by spaces, without the
+        collection or property names and without lowercasing.
+        """
+        names = sorted(p["name"] for p in self.properties_config if p.get("vectorize_property"))
+        return " ".join(str(properties[n]) for n in names if properties.get(n) is not None)
+
+    def _server_input_matches(self) -> bool:
+        """
+        Whether the collection's vectorizer embeds exactly ``_vectorize_text``.
+        Collections created before client-side embedding vectorize their class name
+        too, so their vectors cannot be mixed with client-side ones.
+        """
+        try:
+            vector_config = self.collection.config.get().vector_config or {}
+        except Exception as e:
+            print(f"⚠️ Could not read the vectorizer config of '{self.collection_name}': {e}")
+            return False
+        config = vector_config.get("text_vector")
+        if config is None:
+            return False
+        return not config.vectorizer.model.get("vectorizeClassName", True)
+
+    def _attach_vectors(self, batch):
+        """
+        Turn a batch into DataObjects carrying their vector, embedding only cache misses.
+        If embedding fails the batch is sent as is and Weaviate vectorizes it itself.
+        """
+        objects = [obj if isinstance(obj, DataObject) else DataObject(properties=obj) for obj in batch]
+        try:
+            vectors = self.embedder.embed(
+                [self._vectorize_text(obj.properties) for obj in objects], task=PASSAGE_TASK
+            )
+        except Exception as e:
+            print(f"⚠️ Client-side embedding failed, falling back to Weaviate vectorizer: {e}")
+            return batch
+        return [
+            DataObject(properties=obj.properties, uuid=obj.uuid, vector={"text_vector": vector})
+            for obj, vector in zip(objects, vectors)
+        ]
 
     def _vector_config(self):
         """Return vector_config based on embedding provider."""
@@ -39,15 +188,19 @@ class WeaviateClient:
         if self.embedding_provider == "jina":
             return Configure.Vectors.text2vec_jinaai(
                 name="text_vector",
-                model=self.embedding_model or "jina-embeddings-v3",
-                source_properties=vectorize_props
+                model=self._model_name(),
+                source_properties=vectorize_props,
+                # Keep the server input equal to _vectorize_text, so cached client-side
+                # vectors and server-side ones are interchangeable.
+                vectorize_collection_name=False
             )
 
         elif self.embedding_provider == "openai":
             return Configure.Vectors.text2vec_openai(
                 name="text_vector",
-                model=self.embedding_model or "text-embedding-3-small",
-                source_properties=vectorize_props
+                model=self._model_name(),
+                source_properties=vectorize_props,
+                vectorize_collection_name=False
             )
 
         else:
@@ -69,42 +222,246 @@ class WeaviateClient:
         )
 
     def insert_data_from_lists(self, **kwargs):
-        lengths = {len(v) for v in kwargs.values()}
+        """
+        Insert objects given as one list (or iterable) per property,
+        e.g. ``insert_data_from_lists(text=[...], source=[...])``.
 
-        if len(lengths) != 1:
+        :return: IngestReport of the insert.
+        """
+        lengths = {len(v) for v in kwargs.values() if hasattr(v, "__len__")}
+
+        if len(lengths) > 1:
             raise ValueError("All property lists must have the same length.")
-        data = [dict(zip(kwargs.keys(), vals)) for vals in zip(*kwargs.values())]
-        print(f"📥 Inserting {len(data)} items...")
-        response = self.collection.data.insert_many(data)
-        if response.has_errors:
-            print("❌ Insert Errors:")
-            print(response.errors)
+        data = (dict(zip(kwargs.keys(), vals)) for vals in zip(*kwargs.values()))
+        print(f"📥 Inserting {lengths.pop() if lengths else 'streamed'} items...")
+        report = self.insert_stream(data)
+        if report.has_errors:
+            print(f"❌ Insert Errors: {len(report.failed)} objects failed")
+            for _, error in report.failed[:10]:
+                print(f"   {error}")
         else:
             print("✅ Insert complete.")
+        return report
+
+    def insert_stream(
+        self,
+        objects: Iterable,
+        batch_size: int = 100,
+        max_batch_bytes: Optional[int] = 8 * 1024 * 1024,
+        concurrency: int = 2,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+    ) -> IngestReport:
+        """
+        Stream objects into the collection in batches.
+
+        The iterable is consumed lazily and at most ``2 * concurrency`` batches are
+        in memory at once. With a client-side embedder, each batch gets its vectors
+        (from the embedding cache where possible) before it is sent. Objects that fail are retried with exponential backoff;
+        those still failing after ``max_retries`` are returned in the report.
+
+        :param objects: Iterable of property dicts or ``weaviate.classes.data.DataObject``.
+        :param batch_size: Maximum number of objects per insert_many request.
+        :param max_batch_bytes: Also close a batch once its text reaches this size (None: count only).
+        :param concurrency: Number of batches sent in parallel.
+        :param max_retries: Retries per failed object.
+        :param backoff_seconds: Initial backoff, doubled after each retry.
+        :return: IngestReport with inserted count, failures and throughput.
+        """
+        report = IngestReport()
+        start_time = time.time()
+        in_flight = set()
+
+        def collect(done):
+            for future in done:
+                inserted, failed = future.result()
+                report.inserted += inserted
+                report.failed.extend(failed)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for batch in _iter_batches(objects, batch_size, max_batch_bytes):
+                if self.embedder:
+                    batch = self._attach_vectors(batch)
+                if len(in_flight) >= 2 * concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(executor.submit(self._send_batch, batch, max_retries, backoff_seconds))
+                report.batches += 1
+            collect(wait(in_flight).done)
+
+        report.elapsed_seconds = time.time() - start_time
+        if report.inserted:
+            self.invalidate_query_cache()
+        print(
+            f"📊 Inserted {report.inserted} objects in {report.batches} batches "
+            f"({report.objects_per_second:.1f} objects/sec), {len(report.failed)} failed"
+        )
+        if self.embedder:
+            print(f"   Embedding cache: {self.embedder.hits} hits, {self.embedder.misses} misses")
+        return report
+
+    def _send_batch(self, batch, max_retries, backoff_seconds):
+        """
+        Insert one batch, retrying only the objects that failed.
+
+        :return: (number inserted, list of (object, error message) that still failed).
+        """
+        pending = batch
+        inserted = 0
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.collection.data.insert_many(pending)
+                failed = [(pending[i], error.message) for i, error in sorted(response.errors.items())]
+            except Exception as e:
+                failed = [(obj, str(e)) for obj in pending]
+            inserted += len(pending) - len(failed)
+            if not failed or attempt == max_retries:
+                return inserted, failed
+            time.sleep(backoff_seconds * 2 ** attempt)
+            pending = [obj for obj, _ in failed]
+        return inserted, []
+
+    def _query_vector(self, query_text):
+        """Query embedding from the query vector cache, embedding it on a miss."""
+        vector = self.query_vector_cache.get(query_text)
+        if vector is None:
+            vector = self.embedder.embed([query_text], task=QUERY_TASK)[0]
+            self.query_vector_cache.set(query_text, vector)
+        return vector
+
+    def query_data(self, query_text, limit=5, filters=None, verbose=True):
+        """
+        Semantic search with reranking.
+
+        Ranked results are cached per (collection, query, limit, filters) until they
+        expire or the collection is modified through this client. With a client-side
+        embedder the query vector is cached too and sent with near_vector.
+
+        :return: List of dicts with uuid, properties, distance and rerank_score.
+        """
+        if verbose:
+            print(f"\n🔍 Querying for: {query_text}\n")
+        key = (self.collection_name, query_text, limit, repr(filters))
+        results = self.result_cache.get(key)
+        if results is None:
+            query_args = dict(
+                limit=limit,
+                filters=filters,
+                rerank=Rerank(prop="text", query=query_text),
+                return_metadata=MetadataQuery(distance=True),
+                return_properties=[prop["name"] for prop in self.properties_config]
+            )
+            if self.embedder:
+                response = self.collection.query.near_vector(
+                    near_vector=self._query_vector(query_text), target_vector="text_vector", **query_args
+                )
+            else:
+                response = self.collection.query.near_text(query=query_text, **query_args)
+            results = [
+                {
+                    "uuid": str(obj.uuid),
+                    "properties": dict(obj.properties),
+                    "distance": obj.metadata.distance,
+                    "rerank_score": obj.metadata.rerank_score,
+                }
+                for obj in response.objects
+            ]
+            self.result_cache.set(key, results)
+        if verbose:
+            for i, result in enumerate(results, start=1):
+                print(f"Result #{i}:")
+                for prop in self.properties_config:
+                    name = prop["name"]
+                    print(f"{name}:", result["properties"].get(name))
+                print("Distance:", result["distance"])
+                print("Rerank Score:", result["rerank_score"])
+                print("---")
+        return results
+
+    def invalidate_query_cache(self):
+        """Drop cached query results; called whenever the collection changes."""
+        self.result_cache.clear()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the query caches (and the embedding cache, if any)."""
+        stats = {
+            "query_vectors": self.query_vector_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
+        if self.embedder:
+            stats["embeddings"] = {"hits": self.embedder.hits, "misses": self.embedder.misses}
+        return stats
+
+    def object_uuid(self, source: str, chunk_index: int = 0) -> str:
+        """
+        Deterministic UUID of a chunk: the same source path and chunk index always
+        map to the same object, so re-ingesting overwrites instead of duplicating.
+        """
+        return generate_uuid5(f"{source}#{chunk_index}", self.collection_name)
+
+    def _existing_hashes(self, source: str, page_size: int = 1000) -> dict:
+        """Return {uuid: content_hash} of the objects currently stored for a source."""
+        existing = {}
+        offset = 0
+        while True:
+            response = self.collection.query.fetch_objects(
+                filters=Filter.by_property("source").equal(source),
+                return_properties=["content_hash"],
+                limit=page_size,
+                offset=offset,
+            )
+            for obj in response.objects:
+                existing[str(obj.uuid)] = obj.properties.get("content_hash")
+            if len(response.objects) < page_size:
+                return existing
+            offset += page_size
+
+    def upsert_source(self, source: str, texts: List[str], extra_properties: Optional[List[dict]] = None,
+                      **stream_kwargs) -> IngestReport:
+        """
+        Idempotently store the chunks of one source.
+
+        Every chunk gets a deterministic UUID from (source, chunk index) and a hash of
+        its properties. Only new or changed chunks are sent; chunks that no longer
+        exist (the document got shorter) are deleted by id.
+
+        :param source: Source file path.
+        :param texts: Chunk texts, in chunk order.
+        :param extra_properties: Optional per-chunk dicts of additional properties.
+        :param stream_kwargs: Passed to insert_stream.
+        :return: IngestReport of the changed chunks.
+        """
+        extra_properties = extra_properties or [{} for _ in texts]
+        wanted = {}
+        for chunk_index, (text, extra) in enumerate(zip(texts, extra_properties)):
+            properties = {"text": text, "source": source, "chunk_index": chunk_index, **extra}
+            properties["content_hash"] = hash_json(properties)
+            wanted[self.object_uuid(source, chunk_index)] = properties
+
+        existing = self._existing_hashes(source)
+        changed = [
+            DataObject(properties=properties, uuid=uuid)
+            for uuid, properties in wanted.items()
+            if existing.get(uuid) != properties["content_hash"]
+        ]
+        stale = [uuid for uuid in existing if uuid not in wanted]
 
-    def query_data(self, query_text, limit=5):
-        print(f"\n🔍 Querying for: {query_text}\n")
-        response = self.collection.query.near_text(
-            query=query_text,
-            limit=limit,
-            rerank=Rerank(prop="text"),
-            return_metadata=MetadataQuery(distance=True),
-            return_properties=[prop["name"] for prop in self.properties_config]
+        report = self.insert_stream(changed, **stream_kwargs) if changed else IngestReport()
+        if stale:
+            self.collection.data.delete_many(where=Filter.by_id().contains_any(stale))
+            self.invalidate_query_cache()
+        print(
+            f"♻️ Upserted '{source}': {len(changed)} new/changed, "
+            f"{len(wanted) - len(changed)} unchanged, {len(stale)} removed"
         )
-        for i, obj in enumerate(response.objects, start=1):
-            print(f"Result #{i}:")
-            for prop in self.properties_config:
-                name = prop["name"]
-                print(f"{name}:", obj.properties.get(name))
-            print("Distance:", obj.metadata.distance)
-            print("Rerank Score:", obj.metadata.rerank_score)
-            print("---")
+        return report
 
     def delete_by_source(self, file_source: str):
         print(f"🗑️ Attempting to delete objects with source: {file_source}")
         result = self.collection.data.delete_many(
             where=Filter.by_property("source").equal(file_source)
         )
+        self.invalidate_query_cache()
         print(f"Successfully Deleted {result.matches} and failed {result.failed}")
 
 
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.agentic_extractor import AgenticExtractor, ExtractionFailed
+from src.rate_limiter import AdaptiveTokenBucket
+
+# What agentic_doc returns once its own retries on a 429 are exhausted: no exception,
+# just a page error wrapping tenacity's RetryError.
+THROTTLED = "RetryError[<Future at 0x7f state=finished raised RetryableError>]"
+
+
+def _parsed(extraction=None, error=None):
+    errors = [SimpleNamespace(page_num=0, error=error, error_code=-1)] if error else []
+    return [SimpleNamespace(extraction=extraction, errors=errors, extraction_error=None)]
+
+
+class StandInParse:
+    """parse_fn replacement answering from a script of responses per file name."""
+
+    def __init__(self, script):
+        self.script = {name: list(responses) for name, responses in script.items()}
+        self.calls = []
+
+    def __call__(self, file_path, **kwargs):
+        name = file_path.rsplit("/", 1)[-1]
+        self.calls.append(name)
+        return self.script[name].pop(0)
+
+
+def _extract_all(extractor, paths, limiter, max_retries=3):
+    async def run():
+        return {path: (extraction, error) async for path, extraction, error in
+                extractor.extract_many(paths, extraction_model={"title": "Company"},
+                                       rate_limiter=limiter, max_retries=max_retries)}
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def limiter():
+    return AdaptiveTokenBucket(rate=50.0, burst=10, min_rate=10.0, max_rate=100.0, increase=1.0)
+
+
+def test_throttled_document_backs_off_and_is_retried(limiter):
+    parse = StandInParse({"a.png": [_parsed(error=THROTTLED), _parsed({"name": "A"})]})
+    extractor = AgenticExtractor(parse_fn=parse, preselect_pages=False)
+    assert _extract_all(extractor, ["/docs/a.png"], limiter) == {"/docs/a.png": ({"name": "A"}, None)}
+    assert parse.calls == ["a.png", "a.png"]
+    assert limiter.throttled == 1
+    # Halved by the 429, then one additive step for the success.
+    assert limiter.rate == pytest.approx(26.0)
+
+
+def test_hard_failure_is_a_per_file_error(limiter):
+    parse = StandInParse({
+        "bad.png": [_parsed(error="400 - unsupported file")],
+        "good.png": [_parsed({"name": "G"})],
+    })
+    extractor = AgenticExtractor(parse_fn=parse, preselect_pages=False)
+    results = _extract_all(extractor, ["/docs/bad.png", "/docs/good.png"], limiter)
+    assert results["/docs/good.png"] == ({"name": "G"}, None)
+    extraction, error = results["/docs/bad.png"]
+    assert extraction is None and "unsupported file" in error
+    # Not retried, and the limiter only counted the success.
+    assert parse.calls.count("bad.png") == 1
+    assert limiter.throttled == 0
+    assert limiter.rate == pytest.approx(51.0)
+
+
+def test_throttling_past_max_retries_fails_the_file(limiter):
+    parse = StandInParse({"a.png": [_parsed(error=THROTTLED)] * 3})
+    extractor = AgenticExtractor(parse_fn=parse, preselect_pages=False)
+    extraction, error = _extract_all(extractor, ["/docs/a.png"], limiter, max_retries=2)["/docs/a.png"]
+    assert extraction is None and "RetryableError" in error
+    assert limiter.throttled == 2
+
+
+def test_missing_extraction_raises():
+    extractor = AgenticExtractor(parse_fn=StandInParse({"a.png": [_parsed()]}), preselect_pages=False)
+    with pytest.raises(ExtractionFailed, match="no extraction returned"):
+        extractor.extract("/docs/a.png", {"title": "Company"})
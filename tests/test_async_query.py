@@ -0,0 +1,18 @@
+import asyncio
+
+import pytest
+
+from src.async_query import AsyncWeaviateQueryClient, benchmark
+
+
+def test_query_before_connect_raises():
+    client = AsyncWeaviateQueryClient()
+    with pytest.raises(RuntimeError, match="connect"):
+        asyncio.run(client.query("会社概要"))
+    with pytest.raises(RuntimeError, match="connect"):
+        asyncio.run(client.batch_query(["会社概要"]))
+
+
+def test_benchmark_without_queries_raises():
+    with pytest.raises(ValueError):
+        asyncio.run(benchmark(AsyncWeaviateQueryClient(), []))
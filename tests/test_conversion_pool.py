@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.conversion_pool as conversion_pool
+from src.conversion_pool import ConversionPool
+
+
+class FakeConverter:
+    """Stands in for DoclingConverter: documents are lists of their page numbers."""
+
+    def __init__(self, failures=None):
+        # (path, first page) -> number of times the range fails before it converts.
+        self.failures = dict(failures or {})
+        self.calls = []
+
+    def shard_ranges(self, path, shard_pages, min_pages):
+        return [(1, 2), (3, 4), (5, 5)] if path.startswith("big") else None
+
+    def convert_page_range(self, path, page_range):
+        self.calls.append((path, tuple(page_range)))
+        key = (path, page_range[0])
+        if self.failures.get(key):
+            self.failures[key] -= 1
+            return None, "boom"
+        return list(range(page_range[0], page_range[1] + 1)), None
+
+    def merge_shards(self, path, fragments):
+        return [page for fragment in fragments for page in fragment]
+
+    def iter_documents(self, paths):
+        for path in paths:
+            yield path, "single pass", None
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    def make(converter):
+        monkeypatch.setattr(conversion_pool, "_worker_converter", converter)
+        pool = ConversionPool.__new__(ConversionPool)
+        pool.logger = conversion_pool.setup_logger("etl_app")
+        pool.converter = converter
+        pool.shard_pages, pool.shard_min_pages = 2, 4
+        pool.executor = ThreadPoolExecutor(max_workers=4)
+        return pool
+
+    return make
+
+
+def _convert(pool, tasks):
+    with pool:
+        return {path: (document, error) for path, document, error in pool.convert(tasks)}
+
+
+def test_shards_are_merged_in_page_order(make_pool):
+    results = _convert(make_pool(FakeConverter()), [["a.pdf", "big.pdf"], ["b.docx"]])
+    assert results == {
+        "a.pdf": ("single pass", None),
+        "b.docx": ("single pass", None),
+        "big.pdf": ([1, 2, 3, 4, 5], None),
+    }
+
+
+def test_failed_shard_is_retried_once(make_pool):
+    converter = FakeConverter(failures={("big.pdf", 3): 1})
+    assert _convert(make_pool(converter), [["big.pdf"]]) == {"big.pdf": ([1, 2, 3, 4, 5], None)}
+    assert converter.calls.count(("big.pdf", (3, 4))) == 2
+
+
+def test_shard_failing_twice_falls_back_to_single_pass(make_pool):
+    converter = FakeConverter(failures={("big.pdf", 3): 2})
+    assert _convert(make_pool(converter), [["big.pdf"]]) == {"big.pdf": ("single pass", None)}
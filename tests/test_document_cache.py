@@ -0,0 +1,36 @@
+import gzip
+
+from docling_core.types.doc.document import DoclingDocument
+from docling_core.types.doc.labels import DocItemLabel
+
+from src.document_cache import DocumentCache
+
+
+def _document():
+    document = DoclingDocument(name="report")
+    document.add_text(label=DocItemLabel.TEXT, text="hello")
+    return document
+
+
+def test_round_trip(tmp_path):
+    cache = DocumentCache(tmp_path)
+    assert cache.get("abc123", "options") is None
+    assert not cache.contains("abc123", "options")
+    cache.put("abc123", "options", _document())
+    assert cache.contains("abc123", "options")
+    assert cache.get("abc123", "options").export_to_dict() == _document().export_to_dict()
+
+
+def test_other_content_or_options_miss(tmp_path):
+    cache = DocumentCache(tmp_path)
+    cache.put("abc123", "options", _document())
+    assert cache.get("def456", "options") is None
+    assert cache.get("abc123", "other-options") is None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = DocumentCache(tmp_path)
+    cache.put("abc123", "options", _document())
+    with gzip.open(cache._path("abc123", "options"), "wt") as f:
+        f.write("{not json")
+    assert cache.get("abc123", "options") is None
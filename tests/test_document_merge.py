@@ -0,0 +1,47 @@
+import pytest
+from docling_core.types.doc.base import BoundingBox, Size
+from docling_core.types.doc.document import DoclingDocument, ProvenanceItem, TableData
+from docling_core.types.doc.labels import DocItemLabel
+
+from src.document_merge import merge_documents
+
+
+def _prov(page_no):
+    return ProvenanceItem(page_no=page_no, bbox=BoundingBox(l=0, t=10, r=10, b=0), charspan=(0, 1))
+
+
+def build(pages):
+    """A document with a heading, a list, a paragraph and a table per page."""
+    document = DoclingDocument(name="report")
+    for page_no in pages:
+        document.add_page(page_no=page_no, size=Size(width=100, height=100))
+        document.add_heading(f"Section {page_no}", prov=_prov(page_no))
+        group = document.add_group(label="list", name="list")
+        document.add_list_item(f"item {page_no}", parent=group, prov=_prov(page_no))
+        document.add_text(label=DocItemLabel.TEXT, text=f"paragraph {page_no}", prov=_prov(page_no))
+        document.add_table(data=TableData(num_rows=0, num_cols=0), prov=_prov(page_no))
+    return document
+
+
+def test_merge_matches_single_pass_conversion():
+    fragments = [build([4, 5]), build([1, 2]), build([3])]
+    assert merge_documents(fragments).export_to_dict() == build([1, 2, 3, 4, 5]).export_to_dict()
+
+
+def test_references_are_renumbered():
+    merged = merge_documents([build([1]), build([2])])
+    assert [t.self_ref for t in merged.texts] == [f"#/texts/{i}" for i in range(len(merged.texts))]
+    list_item = merged.texts[4]
+    assert list_item.text == "item 2"
+    assert list_item.parent.cref == "#/groups/1"
+    assert merged.groups[1].children[0].cref == list_item.self_ref
+
+
+def test_single_fragment_is_unchanged():
+    document = build([1, 2])
+    assert merge_documents([document]).export_to_dict() == document.export_to_dict()
+
+
+def test_no_fragments():
+    with pytest.raises(ValueError):
+        merge_documents([])
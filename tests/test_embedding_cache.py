@@ -0,0 +1,81 @@
+import pytest
+
+from src.embedding_cache import PASSAGE_TASK, QUERY_TASK, CachedEmbedder, EmbeddingCache
+
+
+class FakeEmbed:
+    """Local embed_fn: the vector of a text is [len(text), calls so far]."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, task=None):
+        self.calls.append((list(texts), task))
+        return [[float(len(text)), float(len(self.calls))] for text in texts]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EmbeddingCache(tmp_path / "embeddings.db")
+    yield c
+    c.close()
+
+
+def test_cached_texts_are_not_re_embedded(cache):
+    embed_fn = FakeEmbed()
+    embedder = CachedEmbedder(embed_fn, provider="jina", model="v3", cache=cache)
+    first = embedder.embed(["alpha", "beta"])
+    assert embedder.embed(["alpha", "beta"]) == first
+    assert len(embed_fn.calls) == 1
+
+
+def test_only_misses_reach_embed_fn_in_input_order(cache):
+    embed_fn = FakeEmbed()
+    embedder = CachedEmbedder(embed_fn, provider="jina", model="v3", cache=cache, batch_size=2)
+    embedder.embed(["bb"])
+    vectors = embedder.embed(["a", "bb", "cccc", "ddddd"])
+    assert embed_fn.calls[1:] == [(["a", "cccc"], PASSAGE_TASK), (["ddddd"], PASSAGE_TASK)]
+    assert vectors == [[1.0, 2.0], [2.0, 1.0], [4.0, 2.0], [5.0, 3.0]]
+
+
+def test_hit_and_miss_counts(cache):
+    embedder = CachedEmbedder(FakeEmbed(), provider="jina", model="v3", cache=cache)
+    embedder.embed(["a", "b"])
+    embedder.embed(["a", "b", "c"])
+    assert (embedder.hits, embedder.misses) == (2, 3)
+
+
+def test_vectors_persist_across_instances(tmp_path):
+    first = EmbeddingCache(tmp_path / "embeddings.db")
+    CachedEmbedder(FakeEmbed(), provider="jina", model="v3", cache=first).embed(["a"])
+    first.close()
+    second = EmbeddingCache(tmp_path / "embeddings.db")
+    embed_fn = FakeEmbed()
+    assert CachedEmbedder(embed_fn, provider="jina", model="v3", cache=second).embed(["a"]) == [[1.0, 1.0]]
+    assert embed_fn.calls == []
+    second.close()
+
+
+@pytest.mark.parametrize("other", [
+    ("openai", "v3", "text", PASSAGE_TASK),
+    ("jina", "v4", "text", PASSAGE_TASK),
+    ("jina", "v3", "text", QUERY_TASK),
+    ("jina", "v3", "other text", PASSAGE_TASK),
+])
+def test_key_depends_on_provider_model_task_and_text(other):
+    assert EmbeddingCache.key("jina", "v3", "text", PASSAGE_TASK) != EmbeddingCache.key(*other)
+
+
+def test_other_model_misses(cache):
+    CachedEmbedder(FakeEmbed(), provider="jina", model="v3", cache=cache).embed(["a"])
+    embed_fn = FakeEmbed()
+    CachedEmbedder(embed_fn, provider="jina", model="v4", cache=cache).embed(["a"])
+    assert embed_fn.calls == [(["a"], PASSAGE_TASK)]
+
+
+def test_without_cache_every_call_embeds():
+    embed_fn = FakeEmbed()
+    embedder = CachedEmbedder(embed_fn, provider="jina", model="v3")
+    embedder.embed(["a"])
+    embedder.embed(["a"])
+    assert len(embed_fn.calls) == 2
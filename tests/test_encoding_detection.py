@@ -0,0 +1,34 @@
+import pytest
+
+from src.db_conversion.encoding_detection import detect_encoding, detect_encoding_from_sample
+
+TEXT = "会社名,代表者,住所\n株式会社ハナムラ,山田 太郎,東京都千代田区丸の内1-1\n"
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "cp932", "euc_jp"])
+def test_japanese_csv_encodings(encoding):
+    assert detect_encoding_from_sample(TEXT.encode(encoding), complete=True) == encoding
+
+
+def test_cp932_extensions():
+    sample = "①㈱ハナムラ,ｶﾌﾞｼｷｶﾞｲｼｬ\n".encode("cp932") + TEXT.encode("cp932")
+    assert detect_encoding_from_sample(sample, complete=True) == "cp932"
+
+
+def test_bom_wins():
+    assert detect_encoding_from_sample(TEXT.encode("utf-8-sig")) == "utf-8-sig"
+    assert detect_encoding_from_sample(TEXT.encode("utf-16")) == "utf-16"
+
+
+def test_sample_cut_inside_a_character():
+    sample = TEXT.encode("euc_jp") * 10
+    assert detect_encoding_from_sample(sample[:-1]) == "euc_jp"
+
+
+def test_detect_encoding_reads_only_the_sample(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(TEXT.encode("utf-8") * 50 + "終わり".encode("euc_jp"))
+    # The euc_jp tail is outside the sample.
+    assert detect_encoding(path, sample_bytes=1024) == "utf-8"
+    path.write_bytes(TEXT.encode("euc_jp"))
+    assert detect_encoding(path) == "euc_jp"
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import BaseModel, Field
+
+from src.extraction_cache import ExtractionCache, schema_hash
+
+
+class Company(BaseModel):
+    name: str = Field(description="Company name")
+
+
+class CompanyRenamed(BaseModel):
+    name: str = Field(description="Registered company name")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ExtractionCache(tmp_path / "extractions.db")
+    yield c
+    c.close()
+
+
+def test_schema_hash_follows_the_schema():
+    assert schema_hash(Company) == schema_hash(Company.model_json_schema())
+    assert schema_hash(Company) != schema_hash(CompanyRenamed)
+
+
+def test_hit_and_miss_counts(cache):
+    key = schema_hash(Company)
+    assert cache.get("doc", key) is None
+    cache.put("doc", key, {"name": "株式会社テスト"}, schema_title="Company")
+    assert cache.get("doc", key) == {"name": "株式会社テスト"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_edited_schema_misses(cache):
+    cache.put("doc", schema_hash(Company), {"name": "x"}, schema_title="Company")
+    assert cache.get("doc", schema_hash(CompanyRenamed)) is None
+
+
+def test_prune_keeps_current_schema_versions(cache):
+    old, new = schema_hash(Company), schema_hash(CompanyRenamed)
+    cache.put("doc", old, {"name": "x"}, schema_title="Company")
+    cache.put("doc", new, {"name": "x"}, schema_title="Company")
+    cache.put("doc", "other", {"title": "y"}, schema_title="Other")
+    assert cache.prune("Company", [new]) == 1
+    assert cache.get("doc", old) is None
+    assert cache.get("doc", new) == {"name": "x"}
+    assert cache.get("doc", "other") == {"title": "y"}
+
+
+def test_results_persist(tmp_path):
+    first = ExtractionCache(tmp_path / "extractions.db")
+    first.put("doc", "key", {"name": "x"})
+    first.close()
+    second = ExtractionCache(tmp_path / "extractions.db")
+    assert second.get("doc", "key") == {"name": "x"}
+    second.close()
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from src.manifest import (
+    FILE_CHANGED,
+    FILE_NEW,
+    FILE_UNCHANGED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    FileManifest,
+)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    m = FileManifest(tmp_path / "manifest.db", pipeline_version="v1")
+    yield m
+    m.close()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("hello")
+    return path
+
+
+def test_new_file_until_all_sinks_done(manifest, source):
+    assert manifest.check(source, ["weaviate", "markdown"]) == FILE_NEW
+    manifest.begin(source)
+    manifest.mark(source, "weaviate", STATUS_DONE)
+    assert manifest.check(source, ["weaviate", "markdown"]) == FILE_CHANGED
+    manifest.mark(source, "markdown", STATUS_DONE)
+    assert manifest.check(source, ["weaviate", "markdown"]) == FILE_UNCHANGED
+
+
+def test_failed_sink_is_retried(manifest, source):
+    manifest.begin(source)
+    manifest.mark(source, "weaviate", STATUS_DONE)
+    manifest.mark(source, "markdown", STATUS_FAILED, error="disk full")
+    assert manifest.check(source, ["weaviate", "markdown"]) == FILE_CHANGED
+    # A rerun of the same content keeps the sinks that already succeeded.
+    manifest.begin(source)
+    manifest.mark(source, "markdown", STATUS_DONE)
+    assert manifest.check(source, ["weaviate", "markdown"]) == FILE_UNCHANGED
+
+
+def test_skipped_counts_as_processed(manifest, source):
+    manifest.begin(source)
+    manifest.mark_all(source, ["weaviate"], STATUS_SKIPPED)
+    assert manifest.check(source, ["weaviate"]) == FILE_UNCHANGED
+
+
+def test_touch_with_same_content_stays_unchanged(manifest, source):
+    manifest.begin(source)
+    manifest.mark(source, "sqlite", STATUS_DONE)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert manifest.check(source, ["sqlite"]) == FILE_UNCHANGED
+
+
+def test_changed_content_resets_sinks(manifest, source):
+    manifest.begin(source)
+    manifest.mark(source, "sqlite", STATUS_DONE)
+    source.write_text("hello, again")
+    assert manifest.check(source, ["sqlite"]) == FILE_CHANGED
+    assert manifest.begin(source) is True
+    assert manifest.check(source, ["sqlite"]) == FILE_CHANGED
+
+
+def test_other_pipeline_version_reprocesses(tmp_path, source):
+    first = FileManifest(tmp_path / "manifest.db", pipeline_version="v1")
+    first.begin(source)
+    first.mark(source, "sqlite", STATUS_DONE)
+    first.close()
+    second = FileManifest(tmp_path / "manifest.db", pipeline_version="v2")
+    assert second.check(source, ["sqlite"]) == FILE_CHANGED
+    second.close()
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import insert, select
+
+from src.db_conversion.models_organization import Organization
+from src.db_conversion.models_person import Person
+from src.db_conversion.name_keys import normalize_name, normalize_organization_name
+from src.db_conversion.pg_controller import Base
+from src.db_conversion.pg_db_utils import DatabaseManager
+
+
+@pytest.mark.parametrize("name", ["株式会社ハナムラオプティクス", "ハナムラオプティクス（株）", "㈱ハナムラ オプティクス",
+                                  "ハナムラオプティクス株式会社"])
+def test_organization_name_variants_share_a_key(name):
+    assert normalize_organization_name(name) == "ハナムラオプティクス"
+
+
+def test_person_names_fold_width_case_and_spaces():
+    assert normalize_name("山田　太郎") == normalize_name("山田 太郎") == "山田太郎"
+    assert normalize_name("ＪＯＨＮ  Smith") == "johnsmith"
+
+
+@pytest.mark.parametrize("empty", [None, "", "   ", "株式会社"])
+def test_empty_names_have_no_key(empty):
+    assert normalize_organization_name(empty) is None
+
+
+@pytest.fixture
+def manager(monkeypatch, tmp_path):
+    # The duplicate merge only uses portable SQL, so SQLite stands in for Postgres.
+    monkeypatch.setenv("PG_DB_URL", f"sqlite:///{tmp_path / 'orgs.db'}")
+    db = DatabaseManager()
+    Base.metadata.create_all(bind=db.engine)
+    # Tables from before the name keys: no unique indexes yet.
+    for model in (Organization, Person):
+        for index in model.__table__.indexes:
+            index.drop(bind=db.engine)
+    return db
+
+
+def test_merge_duplicates_keeps_oldest_row_and_moves_persons(manager):
+    orgs, persons = Organization.__table__, Person.__table__
+    with manager.engine.begin() as conn:
+        for row in [
+            {"id": 1, "organization_name": "株式会社A", "normalized_name": "a", "history": "founded 1990"},
+            {"id": 2, "organization_name": "A(株)", "normalized_name": "a", "history": "", "sales_trends": "up"},
+            {"id": 3, "organization_name": "B", "normalized_name": "b"},
+        ]:
+            conn.execute(insert(orgs).values(row))
+        for row in [
+            {"id": 10, "person_name": "山田 太郎", "normalized_name": "山田太郎", "organization_id": 1},
+            {"id": 11, "person_name": "山田太郎", "normalized_name": "山田太郎", "organization_id": 2,
+             "title": "CEO"},
+            {"id": 12, "person_name": "佐藤", "normalized_name": "佐藤", "organization_id": 2},
+        ]:
+            conn.execute(insert(persons).values(row))
+        manager._merge_duplicates(conn, orgs, ["normalized_name"])
+        manager._merge_duplicates(conn, persons, ["organization_id", "normalized_name"])
+
+        org_rows = conn.execute(select(orgs.c.id, orgs.c.history, orgs.c.sales_trends).order_by(orgs.c.id)).all()
+        person_rows = conn.execute(
+            select(persons.c.id, persons.c.organization_id, persons.c.title).order_by(persons.c.id)
+        ).all()
+    assert org_rows == [(1, "founded 1990", "up"), (3, None, None)]
+    assert person_rows == [(10, 1, "CEO"), (12, 1, None)]
+    # The unique name-key indexes can be built now.
+    for model in (Organization, Person):
+        for index in model.__table__.indexes:
+            index.create(bind=manager.engine)
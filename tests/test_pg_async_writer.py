@@ -0,0 +1,78 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.db_conversion.pg_async_writer import AsyncPostgresWriter, _merge_org_rows
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.copies = {}
+        self._next_id = 100
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch(self, sql, *args):
+        self.statements.append(sql)
+        if "nextval" in sql:
+            ids = list(range(self._next_id, self._next_id + args[0]))
+            self._next_id += args[0]
+            return [(i,) for i in ids]
+        # INSERT ... RETURNING id, normalized_name: every staged row is new.
+        key_index = ["id", *self.copy_columns].index("normalized_name")
+        return [{"id": row[0], "normalized_name": row[key_index]} for row in self.copies["_org_stage"]]
+
+    async def execute(self, sql, *args):
+        self.statements.append(sql)
+
+    async def copy_records_to_table(self, table, records, columns):
+        if table == "_org_stage":
+            self.copy_columns = columns[1:]
+        self.copies[table] = list(records)
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def test_merge_org_rows_collapses_keys():
+    rows = [{"normalized_name": "a", "history": "old"}, {"normalized_name": "a", "history": ""},
+            {"normalized_name": None, "history": "x"}]
+    staged = _merge_org_rows([1, 2, 3], rows)
+    assert [row[0] for row in staged] == [1, 3]
+
+
+def test_upserts_lock_rows_in_key_order():
+    pool = FakePool()
+    writer = AsyncPostgresWriter(pool=pool)
+    records = [
+        {"organization_name": "株式会社B", "representative_persons": {"person_name": "Z"}},
+        {"organization_name": "A", "representative_persons": {"person_name": "Y"}},
+        {"organization_name": "B(株)"},
+    ]
+    ids = asyncio.run(writer.write_batch(records))
+    assert ids[0] == ids[2] != ids[1]
+    upserts = [sql for sql in pool.conn.statements if sql.startswith("INSERT INTO")]
+    assert "FROM _org_stage ORDER BY normalized_name, id ON CONFLICT" in upserts[0]
+    assert "FROM _person_stage ORDER BY organization_id, normalized_name ON CONFLICT" in upserts[1]
+
+
+def test_none_record_fails_alone():
+    pool = FakePool()
+
+    async def run():
+        async with AsyncPostgresWriter(pool=pool, flush_interval=0.01) as writer:
+            await writer.submit({"organization_name": "A"}, source="a.pdf")
+            await writer.submit(None, source="broken.pdf")
+        return writer
+
+    writer = asyncio.run(run())
+    assert list(writer.failed_sources) == ["broken.pdf"]
+    assert len(writer.org_ids) == 1
@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.rate_limiter as rate_limiter
+from src.rate_limiter import AdaptiveTokenBucket, throttle_info
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_additive_increase_up_to_max_rate():
+    bucket = AdaptiveTokenBucket(rate=1.0, max_rate=1.5, increase=0.2)
+    bucket.on_success()
+    assert bucket.rate == pytest.approx(1.2)
+    bucket.on_success()
+    bucket.on_success()
+    assert bucket.rate == 1.5
+
+
+def test_multiplicative_decrease_down_to_min_rate(clock):
+    bucket = AdaptiveTokenBucket(rate=1.0, min_rate=0.3, decrease=0.5)
+    bucket.on_throttle()
+    assert bucket.rate == 0.5
+    bucket.on_throttle()
+    assert bucket.rate == 0.3
+    assert bucket.throttled == 2
+
+
+def test_throttle_empties_bucket_and_honours_retry_after(clock):
+    bucket = AdaptiveTokenBucket(rate=10.0, burst=4)
+    bucket.on_throttle(retry_after=3.0)
+    assert bucket._tokens == 0
+    assert bucket._blocked_until == clock.now + 3.0
+
+
+def test_acquire_waits_for_a_token(clock, monkeypatch):
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    bucket = AdaptiveTokenBucket(rate=2.0, burst=1)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(take(3))
+    # The burst allows one request at once; the next ones wait 1 / rate each.
+    assert slept == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_acquire_waits_out_retry_after(clock, monkeypatch):
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    bucket = AdaptiveTokenBucket(rate=1.0, burst=1)
+    bucket.on_throttle(retry_after=5.0)
+    asyncio.run(bucket.acquire())
+    assert slept[0] == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (SimpleNamespace(status_code=429), (True, None)),
+    (SimpleNamespace(response=SimpleNamespace(status_code=503, headers={"Retry-After": "7"})), (True, 7.0)),
+    (RuntimeError("Rate limit exceeded"), (True, None)),
+    (RuntimeError("connection reset"), (False, None)),
+])
+def test_throttle_info(error, expected):
+    assert throttle_info(error) == expected
@@ -0,0 +1,102 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.db_conversion.schema_inference import SchemaStore, TableSchema, coerce_frame, infer_schema
+
+
+def _kinds(df):
+    return {c.name: c.kind for c in infer_schema(df).columns}
+
+
+def test_column_kinds():
+    df = pd.DataFrame({
+        "count": [1, 2, 3],
+        "ratio": [0.5, 1.25, None],
+        "whole_floats": [1.0, 2.0, None],
+        "amount": ["1,200", "35", "4,000,000"],
+        "zip_code": ["0012", "0340", "1200"],
+        "day": ["2024/1/5", "2024-01-06", "2024年1月7日"],
+        "stamp": ["2024-01-05 10:30", "2024-01-06 08:00:15", "2024-01-07 23:59"],
+        "flag": [True, False, True],
+        "note": ["a", None, "c"],
+        "blank": [None, None, None],
+    })
+    assert _kinds(df) == {
+        "count": "integer",
+        "ratio": "float",
+        "whole_floats": "integer",
+        "amount": "integer",
+        "zip_code": "text",
+        "day": "date",
+        "stamp": "datetime",
+        "flag": "boolean",
+        "note": "text",
+        "blank": "empty",
+    }
+
+
+def test_low_cardinality_text_is_category():
+    df = pd.DataFrame({"prefecture": ["東京都", "大阪府", "愛知県"] * 20})
+    assert _kinds(df) == {"prefecture": "category"}
+
+
+def test_only_the_sample_is_inspected():
+    df = pd.DataFrame({"value": ["1", "2", "three"]})
+    assert [c.kind for c in infer_schema(df, sample_rows=2).columns] == ["integer"]
+
+
+def test_key_columns_are_indexed():
+    df = pd.DataFrame({
+        "row": ["r1", "r2", "r3"],
+        "customer_id": [10, 10, 11],
+        "商品コード": ["A1", "A2", "A1"],
+        "memo": ["x", "y", "z"],
+    })
+    assert infer_schema(df).index_columns == ["row", "customer_id", "商品コード"]
+    assert infer_schema(df, max_indexes=1).index_columns == ["row"]
+
+
+@pytest.mark.parametrize("name, is_key", [
+    ("id", True),
+    ("customer_id", True),
+    ("CustomerID", True),
+    ("orderId", True),
+    ("paid", False),
+    ("valid", False),
+    ("covid", False),
+    ("GUID", False),
+])
+def test_key_column_names(name, is_key):
+    # Not the first column, so only the name can make it a key.
+    df = pd.DataFrame({"memo": ["x", "x", "y"], name: [1, 1, 2]})
+    assert (name in infer_schema(df).index_columns) is is_key
+
+
+def test_coerce_frame_converts_and_keeps_mismatches():
+    schema = infer_schema(pd.DataFrame({
+        "amount": ["1,200", "35"],
+        "day": ["2024/1/5", "2024年1月6日"],
+        "flag": [True, False],
+    }))
+    chunk = pd.DataFrame({
+        "amount": ["4,000", "n/a"],
+        "day": ["2024.02.01", "unknown"],
+        "flag": [False, None],
+    })
+    coerced = coerce_frame(chunk, schema)
+    assert coerced["amount"].tolist() == [4000, "n/a"]
+    assert coerced["day"].tolist() == ["2024-02-01", "unknown"]
+    assert coerced["flag"].tolist() == [0, None]
+
+
+def test_schema_store_round_trip():
+    conn = sqlite3.connect(":memory:")
+    store = SchemaStore(conn)
+    assert store.load("sales") is None
+    schema = infer_schema(pd.DataFrame({"id": [1, 2], "名前": ["a", "b"]}))
+    store.save("sales", schema)
+    assert store.load("sales") == schema
+    assert TableSchema.from_json(schema.to_json()) == schema
+    conn.close()
@@ -0,0 +1,139 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.db_conversion.struct_to_sql import StructuredToSQL
+
+
+def _rows(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f'SELECT * FROM "{table}" ORDER BY 1').fetchall()
+
+
+def _write_workbook(path):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"id": [1, 2], "name": ["x", "y"]}).to_excel(writer, sheet_name="Main", index=False)
+
+
+@pytest.fixture
+def loader(tmp_path):
+    converter = StructuredToSQL(db_path=str(tmp_path / "out.db"), staging_dir=tmp_path / "staging",
+                                sheet_workers=1)
+    yield converter
+    converter.close()
+
+
+def test_copies_with_other_names_load_into_their_own_tables(tmp_path, loader):
+    first, copy = tmp_path / "a.csv", tmp_path / "b.csv"
+    first.write_text("id,name\n1,x\n2,y\n", encoding="utf-8")
+    copy.write_bytes(first.read_bytes())
+    loader.process_individual_file(str(first))
+    loader.process_individual_file(str(copy))
+    assert _rows(loader.db_path, "a") == _rows(loader.db_path, "b") == [(1, "x"), (2, "y")]
+
+
+def test_workbook_copies_use_their_own_table_names(tmp_path, loader):
+    first, copy = tmp_path / "book.xlsx", tmp_path / "copy.xlsx"
+    _write_workbook(first)
+    copy.write_bytes(first.read_bytes())
+    loader.process_individual_file(str(first))
+    loader.process_individual_file(str(copy))
+    assert _rows(loader.db_path, "book_main") == _rows(loader.db_path, "copy_main") == [(1, "x"), (2, "y")]
+
+
+def _tables(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+                if not row[0].startswith("_")}
+
+
+def test_serial_and_parallel_loads_give_the_same_tables(tmp_path):
+    source = tmp_path / "dup.csv"
+    source.write_text("id,amount,amount\n1,10,1.5\n2,20,2.5\n", encoding="cp932")
+    serial = StructuredToSQL(db_path=str(tmp_path / "serial.db"))
+    assert serial.process_individual_file(str(source)) is None
+    serial.close()
+    parallel = StructuredToSQL(db_path=str(tmp_path / "parallel.db"))
+    assert parallel.load_files([str(source)], workers=2) == {}
+    parallel.close()
+    for db in ("serial.db", "parallel.db"):
+        with sqlite3.connect(tmp_path / db) as conn:
+            columns = [(c[1], c[2]) for c in conn.execute('PRAGMA table_info("dup")')]
+        assert columns == [("id", "INTEGER"), ("amount", "INTEGER"), ("amount_1", "REAL")]
+    assert _rows(tmp_path / "serial.db", "dup") == _rows(tmp_path / "parallel.db", "dup")
+
+
+def test_failed_file_is_reported_and_leaves_no_tables(tmp_path, monkeypatch):
+    book = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(book) as writer:
+        pd.DataFrame({"id": [1]}).to_excel(writer, sheet_name="A", index=False)
+        pd.DataFrame({"id": [2]}).to_excel(writer, sheet_name="B", index=False)
+    good = tmp_path / "good.csv"
+    good.write_text("id\n1\n", encoding="utf-8")
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a workbook")
+
+    original = StructuredToSQL._write_frames
+
+    def failing_write(self, table_name, frames, mode="replace"):
+        if table_name == "book_b":
+            raise RuntimeError("disk full")
+        return original(self, table_name, frames, mode)
+
+    monkeypatch.setattr(StructuredToSQL, "_write_frames", failing_write)
+    converter = StructuredToSQL(db_path=str(tmp_path / "out.db"))
+    loaded = []
+    failures = converter.load_files([str(book), str(good), str(broken)], workers=2,
+                                    on_loaded=lambda path, error: loaded.append((path, error)))
+    converter.close()
+
+    assert set(failures) == {str(book), str(broken)}
+    assert "disk full" in failures[str(book)]
+    # The savepoint of the failed workbook rolled back its first sheet too.
+    assert _tables(tmp_path / "out.db") == {"good"}
+    assert [path for path, error in loaded if error is None] == [str(good)]
+
+
+def test_serial_load_returns_the_error(tmp_path):
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a workbook")
+    converter = StructuredToSQL(db_path=str(tmp_path / "out.db"))
+    assert converter.process_individual_file(str(broken))
+    converter.close()
+
+
+def test_identical_files_in_one_batch_are_parsed_once(tmp_path):
+    first, copy = tmp_path / "a.csv", tmp_path / "b.csv"
+    first.write_text("id\n1\n2\n", encoding="utf-8")
+    copy.write_bytes(first.read_bytes())
+    converter = StructuredToSQL(db_path=str(tmp_path / "out.db"), staging_dir=tmp_path / "staging")
+    assert converter.load_files([str(first), str(copy)], workers=2) == {}
+    converter.close()
+    assert _rows(tmp_path / "out.db", "a") == _rows(tmp_path / "out.db", "b") == [(1,), (2,)]
+    assert len(list((tmp_path / "staging").rglob("*.parquet"))) == 1
+
+
+def test_column_empty_in_first_batch_is_loaded(tmp_path):
+    book = tmp_path / "book.xlsx"
+    frame = pd.DataFrame({"id": [1, 2, 3, 4], "note": [None, None, "late", "value"]})
+    with pd.ExcelWriter(book) as writer:
+        frame.to_excel(writer, sheet_name="Main", index=False)
+    converter = StructuredToSQL(db_path=str(tmp_path / "out.db"), staging_dir=tmp_path / "staging",
+                                chunk_rows=2, sheet_workers=1)
+    assert converter.process_individual_file(str(book)) is None
+    converter.close()
+    assert _rows(tmp_path / "out.db", "book_main") == [(1, None), (2, None), (3, "late"), (4, "value")]
+
+
+def test_text_fallback_keeps_columns_empty_in_first_batch(tmp_path):
+    book = tmp_path / "book.xlsx"
+    # "code" turns from numbers to text after the first batch, forcing the text fallback.
+    frame = pd.DataFrame({"code": [1, 2, "A-3", "B-4"], "note": [None, None, "x", "y"]})
+    with pd.ExcelWriter(book) as writer:
+        frame.to_excel(writer, sheet_name="Main", index=False)
+    converter = StructuredToSQL(db_path=str(tmp_path / "out.db"), staging_dir=tmp_path / "staging",
+                                chunk_rows=2, sheet_workers=1)
+    assert converter.process_individual_file(str(book)) is None
+    converter.close()
+    assert [row[1] for row in _rows(tmp_path / "out.db", "book_main")] == [None, None, "x", "y"]